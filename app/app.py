@@ -4,6 +4,38 @@ from app.pages.authenticated_home.authenticated_home_page import authenticated_h
 from app.pages.auth.signup_page import signup_page
 from app.pages.auth.login_page import login_page
 from app.pages.plan.plan_page import plan_page
+from app.pages.auth.password_hasher import calibrate_password_hasher
+from app.pages.auth.session_reaper import session_reaper_task
+from app.pages.plan.catalog import warm_catalog
+from app.pages.plan.status_writer import status_flush_task, status_writer
+from app.pages.auth.session_cache import session_cache
+from app.pages.auth.password_hasher import password_hasher
+from app.pages.auth.hydration import hydration_coordinator
+from app.pages.auth.rate_limit import ip_limiter, username_limiter
+from app.db.instrumentation import query_stats
+from app.monitoring.metrics import Sample, metrics_endpoint, registry, stats_collector
+from app.monitoring.reflex_hooks import install_reflex_hooks
+from app.monitoring.tracing import tracer
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+install_reflex_hooks()
+registry.register(stats_collector("session_cache", session_cache.stats))
+registry.register(stats_collector("password_hasher", password_hasher.stats))
+registry.register(
+    lambda: [
+        Sample("password_hasher_hash_seconds", {}, password_hasher.hash_seconds),
+        Sample("password_hasher_verify_seconds", {}, password_hasher.verify_seconds),
+    ]
+)
+registry.register(stats_collector("hydration", hydration_coordinator.stats))
+registry.register(stats_collector("rate_limiter", ip_limiter.stats, limiter="ip"))
+registry.register(
+    stats_collector("rate_limiter", username_limiter.stats, limiter="username")
+)
+registry.register(stats_collector("plan_status_writer", status_writer.stats))
+registry.register(query_stats.samples)
+registry.register(stats_collector("tracing", tracer.stats))
 
 app = rx.App(
     theme=rx.theme(appearance="light", accent_color="jade", radius="medium"),
@@ -16,9 +48,14 @@ app = rx.App(
         ),
     ],
     stylesheets=["/styles.css"],
+    api_transformer=Starlette(routes=[Route("/metrics", metrics_endpoint)]),
 )
 app.add_page(landing_page, route="/")
 app.add_page(authenticated_home_page, route="/authenticated_home")
 app.add_page(signup_page, route="/signup")
 app.add_page(login_page, route="/login")
-app.add_page(plan_page, route="/plan")
\ No newline at end of file
+app.add_page(plan_page, route="/plan")
+app.register_lifespan_task(calibrate_password_hasher)
+app.register_lifespan_task(session_reaper_task)
+app.register_lifespan_task(warm_catalog)
+app.register_lifespan_task(status_flush_task)
@@ -0,0 +1,77 @@
+import re
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db import queries
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    params: dict
+
+
+NOW = "2000-01-01 00:00:00"
+
+HOT_QUERIES: list[HotQuery] = [
+    HotQuery(
+        "AuthState.hydrate_user",
+        queries.RESOLVE_SESSION_SQL,
+        {"session_id": "x", "now": NOW},
+    ),
+    HotQuery("AuthState.handle_login", queries.LOGIN_USER_SQL, {"username": "x"}),
+    HotQuery(
+        "AuthState.handle_logout",
+        queries.REVOKE_SESSION_SQL,
+        {"session_id": "x", "now": NOW},
+    ),
+    HotQuery(
+        "RevocationList.refresh",
+        queries.REVOKED_SESSIONS_SQL,
+        {"since": NOW, "now": NOW},
+    ),
+    HotQuery("get_catalog[version]", queries.CATALOG_VERSION_SQL, {}),
+    HotQuery(
+        "PlanState.load_plan",
+        queries.PLAN_PAGE_SQL.format(after=queries.PLAN_PAGE_AFTER_DATED),
+        {"user_id": 0, "after_date": "2000-01-01", "after_id": 0, "limit": 51},
+    ),
+    HotQuery(
+        "PlanState.generate_plan[booked]",
+        queries.BOOKED_HOURS_SQL,
+        {"user_id": 0, "start": "2000-01-01", "subject_id": 0},
+    ),
+    HotQuery(
+        "PlanState.generate_plan[existing]",
+        queries.SUBJECT_ROWS_SQL,
+        {"user_id": 0, "subject_id": 0},
+    ),
+    HotQuery(
+        "PlanState.generate_plan[movable]",
+        queries.MOVABLE_ROWS_SQL,
+        {"user_id": 0, "start": "2000-01-01", "subject_id": 0},
+    ),
+    HotQuery("PlanState.delete_plan", queries.DELETE_PLAN_SQL, {"user_id": 0}),
+]
+
+_SQLITE_TABLE_SCAN = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+
+
+def explain(conn: Connection, query: HotQuery) -> list[str]:
+    """Return the plan steps of query that read a whole table."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {query.sql}"), query.params)
+        return [r.detail for r in rows if _SQLITE_TABLE_SCAN.match(r.detail)]
+    rows = conn.execute(text(f"EXPLAIN {query.sql}"), query.params).mappings()
+    return [f"{r['table']} type=ALL" for r in rows if r["type"] == "ALL"]
+
+
+def check_hot_paths(engine: Engine) -> list[tuple[str, str]]:
+    failures = []
+    with engine.connect() as conn:
+        for query in HOT_QUERIES:
+            for step in explain(conn, query):
+                failures.append((query.name, step))
+    return failures
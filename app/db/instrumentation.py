@@ -0,0 +1,125 @@
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.monitoring.histogram import Histogram
+from app.monitoring.metrics import Sample
+from app.monitoring.tracing import tracer
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG", "")
+
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+
+slow_query_logger = logging.getLogger("app.db.slow_queries")
+
+# Qualified name of the handler or function that opened the current session.
+query_source: ContextVar[str] = ContextVar("query_source", default="other")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _statement_summary(statement: str, limit: int = 500) -> str:
+    summary = _WHITESPACE.sub(" ", statement).strip()
+    return summary if len(summary) <= limit else summary[:limit] + "..."
+
+
+class QueryStats:
+    """Per-source statement latency and row count histograms."""
+
+    def __init__(self, slow_threshold: float = SLOW_QUERY_MS / 1000):
+        self.slow_threshold = slow_threshold
+        self.slow = 0
+        self.seconds: dict[str, Histogram] = {}
+        self.rows: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _histograms(self, source: str) -> tuple[Histogram, Histogram]:
+        seconds = self.seconds.get(source)
+        if seconds is None:
+            with self._lock:
+                seconds = self.seconds.setdefault(source, Histogram())
+                self.rows.setdefault(source, Histogram(ROW_BUCKETS))
+        return seconds, self.rows[source]
+
+    def record(self, source: str, statement: str, seconds: float, rows: int) -> None:
+        by_time, by_rows = self._histograms(source)
+        by_time.observe(seconds)
+        if rows >= 0:
+            by_rows.observe(rows)
+        if seconds >= self.slow_threshold:
+            self.slow += 1
+            slow_query_logger.warning(
+                "%.1f ms, %d rows, %s: %s",
+                seconds * 1000,
+                rows,
+                source,
+                _statement_summary(statement),
+            )
+
+    def samples(self) -> Iterable[Sample]:
+        yield Sample("db_slow_queries", {}, self.slow)
+        for source, histogram in list(self.seconds.items()):
+            yield Sample("db_query_seconds", {"source": source}, histogram)
+        for source, histogram in list(self.rows.items()):
+            yield Sample("db_query_rows", {"source": source}, histogram)
+
+    def stats(self) -> dict:
+        return {
+            "slow": self.slow,
+            "sources": {
+                source: {
+                    "seconds": histogram.snapshot(),
+                    "rows": self.rows[source].snapshot(),
+                }
+                for source, histogram in list(self.seconds.items())
+            },
+        }
+
+
+query_stats = QueryStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+    context._query_started_at = time.time()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    # rowcount is rows returned for MySQL SELECTs and rows changed for writes;
+    # drivers that cannot tell (SQLite SELECTs) report -1, which is skipped.
+    seconds = time.perf_counter() - started
+    query_stats.record(query_source.get(), statement, seconds, cursor.rowcount)
+    tracer.record_db(
+        _statement_summary(statement, 200),
+        context._query_started_at,
+        seconds,
+        cursor.rowcount,
+    )
+
+
+_installed = False
+
+
+def install_query_listeners() -> None:
+    """Time every statement on every engine, including async engines' sync cores."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    if SLOW_QUERY_LOG:
+        handler = logging.FileHandler(SLOW_QUERY_LOG)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_logger.addHandler(handler)
+    _installed = True
@@ -0,0 +1,429 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+# Pre-migration layout of schema.sql, used to bootstrap empty stand-in databases.
+baseline = MetaData()
+Table(
+    "localauthsession",
+    baseline,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, nullable=False),
+    Column("session_id", Text, nullable=False),
+    Column("expiration", Text, nullable=False),
+)
+Table(
+    "localuser",
+    baseline,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("username", Text, nullable=False),
+    Column("password_hash", LargeBinary, nullable=False),
+    Column("enabled", BigInteger, nullable=False),
+)
+Table(
+    "student_topics",
+    baseline,
+    Column("student_id", Integer),
+    Column("level", String(255)),
+    Column("subject", String(45)),
+    Column("examboard", String(45)),
+    Column("examcode", String(45)),
+    Column("examdate", String(45)),
+)
+Table(
+    "subjects",
+    baseline,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("level", String(45)),
+    Column("board", String(45)),
+    Column("subject", String(45)),
+    Column("examcode", String(45)),
+    Column("description", String(45)),
+    Column("examdate", String(45)),
+)
+Table(
+    "topics",
+    baseline,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("subjectid", Integer),
+    Column("topic", String(255)),
+    Column("size", String(45)),
+    Column("hours", Integer),
+)
+Table(
+    "userinfo",
+    baseline,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("email", Text, nullable=False),
+    Column("user_id", Integer, nullable=False),
+    Column("created_at", Text, nullable=False),
+    Column("updated_at", Text, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _has_index(conn: Connection, table: str, name: str) -> bool:
+    return any(i["name"] == name for i in inspect(conn).get_indexes(table))
+
+
+def _create_index(
+    conn: Connection, table: str, name: str, columns: str, unique: bool = False
+) -> None:
+    if not _has_index(conn, table, name):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        conn.execute(text(f"CREATE {kind} {name} ON {table} ({columns})"))
+
+
+def _localauthsession_expires_at(conn: Connection) -> None:
+    if not _has_column(conn, "localauthsession", "expires_at"):
+        conn.execute(
+            text("ALTER TABLE localauthsession ADD COLUMN expires_at DATETIME NULL")
+        )
+    if conn.dialect.name == "mysql":
+        backfill = "CAST(REPLACE(expiration, 'T', ' ') AS DATETIME(6))"
+    else:
+        backfill = "datetime(expiration)"
+    conn.execute(
+        text(
+            f"UPDATE localauthsession SET expires_at = {backfill} WHERE expires_at IS NULL"
+        )
+    )
+    _create_index(
+        conn, "localauthsession", "ix_localauthsession_expires_at", "expires_at"
+    )
+
+
+def _to_varchar(conn: Connection, table: str, column: str, length: int) -> None:
+    # TEXT columns cannot carry a full-length index in MySQL; SQLite indexes them as-is.
+    if conn.dialect.name != "mysql":
+        return
+    current = next(c for c in inspect(conn).get_columns(table) if c["name"] == column)
+    if isinstance(current["type"], String) and current["type"].length == length:
+        return
+    nullable = "NULL" if current["nullable"] else "NOT NULL"
+    conn.execute(
+        text(f"ALTER TABLE {table} MODIFY {column} VARCHAR({length}) {nullable}")
+    )
+
+
+def _lookup_indexes(conn: Connection) -> None:
+    _to_varchar(conn, "localauthsession", "session_id", 64)
+    _to_varchar(conn, "localuser", "username", 255)
+    _to_varchar(conn, "userinfo", "email", 255)
+    _create_index(
+        conn,
+        "localauthsession",
+        "ux_localauthsession_session_id",
+        "session_id",
+        unique=True,
+    )
+    _create_index(conn, "localuser", "ux_localuser_username", "username", unique=True)
+    _create_index(conn, "userinfo", "ux_userinfo_email", "email", unique=True)
+    _create_index(conn, "userinfo", "ix_userinfo_user_id", "user_id")
+    _create_index(conn, "subjects", "ix_subjects_level_board", "level, board, subject")
+    _create_index(conn, "topics", "ix_topics_subjectid", "subjectid, topic")
+    _create_index(
+        conn,
+        "student_topics",
+        "ix_student_topics_student_id",
+        "student_id, examdate, subject",
+    )
+
+
+def _localauthsession_revoked_at(conn: Connection) -> None:
+    if not _has_column(conn, "localauthsession", "revoked_at"):
+        conn.execute(
+            text("ALTER TABLE localauthsession ADD COLUMN revoked_at DATETIME NULL")
+        )
+    _create_index(
+        conn, "localauthsession", "ix_localauthsession_revoked_at", "revoked_at"
+    )
+
+
+def _catalog_version(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS catalog_version ("
+            "id INTEGER NOT NULL PRIMARY KEY, "
+            "version INTEGER NOT NULL)"
+        )
+    )
+    if conn.execute(text("SELECT COUNT(*) FROM catalog_version")).scalar() == 0:
+        conn.execute(text("INSERT INTO catalog_version (id, version) VALUES (1, 1)"))
+
+
+def _student_topics_id(conn: Connection) -> None:
+    """Give student_topics the surrogate key that schema.sql lacks."""
+    if _has_column(conn, "student_topics", "id"):
+        return
+    if conn.dialect.name == "mysql":
+        conn.execute(
+            text(
+                "ALTER TABLE student_topics ADD COLUMN id INTEGER NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST"
+            )
+        )
+        return
+    # SQLite cannot add a primary key in place: rebuild the table around one,
+    # from its own CREATE statement so NOT NULL and DEFAULT clauses survive.
+    inspector = inspect(conn)
+    names = ", ".join(c["name"] for c in inspector.get_columns("student_topics"))
+    indexes = inspector.get_indexes("student_topics")
+    create = conn.execute(
+        text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'student_topics'"
+        )
+    ).scalar_one()
+    columns = create[create.index("(") + 1 :]
+    conn.execute(
+        text(
+            "CREATE TABLE student_topics_rebuild "
+            f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {columns}"
+        )
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO student_topics_rebuild ({names}) "
+            f"SELECT {names} FROM student_topics"
+        )
+    )
+    conn.execute(text("DROP TABLE student_topics"))
+    conn.execute(text("ALTER TABLE student_topics_rebuild RENAME TO student_topics"))
+    for index in indexes:
+        _create_index(
+            conn,
+            "student_topics",
+            index["name"],
+            ", ".join(index["column_names"]),
+            unique=bool(index["unique"]),
+        )
+
+
+def _student_topics_topic_id(conn: Connection) -> None:
+    _student_topics_id(conn)
+    if not _has_column(conn, "student_topics", "topic_id"):
+        conn.execute(text("ALTER TABLE student_topics ADD COLUMN topic_id INTEGER NULL"))
+    _backfill_topic_ids(conn)
+
+
+def _backfill_topic_ids(conn: Connection) -> None:
+    # Existing rows only carry the topic name; resolve it within the row's own
+    # subject. Legacy rows can have a NULL examcode, so compare NULL-safely.
+    same = "<=>" if conn.dialect.name == "mysql" else "IS"
+    conn.execute(
+        text(f"""
+        UPDATE student_topics SET topic_id = (
+            SELECT t.id FROM topics t JOIN subjects s ON s.id = t.subjectid
+            WHERE t.topic = student_topics.subject
+            AND s.examcode {same} student_topics.examcode
+            AND s.level {same} student_topics.level
+            AND s.board {same} student_topics.examboard
+            ORDER BY t.id LIMIT 1
+        ) WHERE topic_id IS NULL
+        """)
+    )
+
+
+def _student_topics_schedule(conn: Connection) -> None:
+    if not _has_column(conn, "student_topics", "study_date"):
+        conn.execute(text("ALTER TABLE student_topics ADD COLUMN study_date DATE NULL"))
+    if not _has_column(conn, "student_topics", "hours"):
+        conn.execute(text("ALTER TABLE student_topics ADD COLUMN hours INTEGER NULL"))
+
+
+def _student_topics_status(conn: Connection) -> None:
+    if not _has_column(conn, "student_topics", "status"):
+        conn.execute(
+            text(
+                "ALTER TABLE student_topics ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'Not Started'"
+            )
+        )
+
+
+def _student_topics_plan_keyset(conn: Connection) -> None:
+    # Databases that applied migration 5 before it added the key get it here.
+    _student_topics_id(conn)
+    # Older rows only carry the free-text examdate; give the ISO ones a real
+    # study_date so they page in date order.
+    if conn.dialect.name == "mysql":
+        backfill = "STR_TO_DATE(examdate, '%Y-%m-%d')"
+        iso = "examdate REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}$'"
+    else:
+        backfill = "date(examdate)"
+        iso = "examdate GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    conn.execute(
+        text(
+            f"UPDATE student_topics SET study_date = {backfill} WHERE study_date IS NULL AND {iso}"
+        )
+    )
+    _create_index(
+        conn,
+        "student_topics",
+        "ix_student_topics_plan_keyset",
+        "student_id, study_date, id",
+    )
+
+
+def _student_topics_subject_id(conn: Connection) -> None:
+    # examcode can be NULL and repeats across levels, so plan rows are keyed
+    # by the subject they were generated for.
+    if not _has_column(conn, "student_topics", "subject_id"):
+        conn.execute(
+            text("ALTER TABLE student_topics ADD COLUMN subject_id INTEGER NULL")
+        )
+    _backfill_subject_ids(conn)
+    _create_index(
+        conn,
+        "student_topics",
+        "ix_student_topics_subject_id",
+        "student_id, subject_id",
+    )
+
+
+def _backfill_subject_ids(conn: Connection) -> None:
+    conn.execute(
+        text("""
+        UPDATE student_topics SET subject_id = (
+            SELECT t.subjectid FROM topics t WHERE t.id = student_topics.topic_id
+        ) WHERE subject_id IS NULL AND topic_id IS NOT NULL
+        """)
+    )
+
+
+def _student_topics_null_examcode(conn: Connection) -> None:
+    # Migration 5 once skipped rows with a NULL examcode; resolve them now.
+    _backfill_topic_ids(conn)
+    _backfill_subject_ids(conn)
+
+
+def _password_hash_config(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS password_hash_config ("
+            "id INTEGER NOT NULL PRIMARY KEY, "
+            "rounds INTEGER NOT NULL, "
+            "calibrated_at VARCHAR(32) NOT NULL)"
+        )
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "localauthsession_expires_at", _localauthsession_expires_at),
+    Migration(2, "lookup_indexes", _lookup_indexes),
+    Migration(3, "localauthsession_revoked_at", _localauthsession_revoked_at),
+    Migration(4, "catalog_version", _catalog_version),
+    Migration(5, "student_topics_topic_id", _student_topics_topic_id),
+    Migration(6, "student_topics_schedule", _student_topics_schedule),
+    Migration(7, "student_topics_status", _student_topics_status),
+    Migration(8, "student_topics_plan_keyset", _student_topics_plan_keyset),
+    Migration(9, "student_topics_subject_id", _student_topics_subject_id),
+    Migration(10, "password_hash_config", _password_hash_config),
+    Migration(11, "student_topics_null_examcode", _student_topics_null_examcode),
+]
+
+
+def _applied_versions(conn: Connection) -> set[int]:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER NOT NULL PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, "
+            "applied_at VARCHAR(32) NOT NULL)"
+        )
+    )
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def bootstrap(engine: Engine) -> None:
+    """Create the schema.sql tables that do not exist yet."""
+    baseline.create_all(engine, checkfirst=True)
+
+
+def pending(engine: Engine) -> list[Migration]:
+    with engine.begin() as conn:
+        applied = _applied_versions(conn)
+    return [
+        m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in applied
+    ]
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> list[Migration]:
+    """Apply pending migrations in version order, up to and including target."""
+    ran = []
+    for migration in pending(engine):
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"
+                ),
+                {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "applied_at": datetime.utcnow().isoformat(),
+                },
+            )
+        ran.append(migration)
+    return ran
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply schema migrations.")
+    parser.add_argument("db_url", nargs="?", default=os.environ.get("REFLEX_DB_URL"))
+    parser.add_argument(
+        "--bootstrap",
+        action="store_true",
+        help="create missing baseline tables first (for local stand-in databases)",
+    )
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail if any hot-path query still does a full table scan",
+    )
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error("pass a database URL or set REFLEX_DB_URL")
+    engine = create_engine(args.db_url)
+    if args.bootstrap:
+        bootstrap(engine)
+    for migration in upgrade(engine, args.target):
+        print(f"Applied {migration.version:04d} {migration.name}")
+    if args.check:
+        from app.db.explain_check import check_hot_paths
+
+        failures = check_hot_paths(engine)
+        for name, plan in failures:
+            print(f"Table scan in {name}: {plan}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
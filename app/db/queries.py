@@ -0,0 +1,53 @@
+# Hot-path statements, shared by the code that runs them and by the EXPLAIN
+# check in explain_check.py, so the check always sees what the app executes.
+
+RESOLVE_SESSION_SQL = """SELECT u.id, u.username, i.email, s.expires_at
+    FROM localuser u
+    JOIN localauthsession s ON u.id = s.user_id
+    JOIN userinfo i ON u.id = i.user_id
+    WHERE s.session_id = :session_id
+    AND s.expires_at > :now AND s.revoked_at IS NULL"""
+
+LOGIN_USER_SQL = """SELECT u.id, u.password_hash, i.email FROM localuser u
+    JOIN userinfo i ON i.user_id = u.id WHERE u.username = :username"""
+
+REVOKE_SESSION_SQL = (
+    "UPDATE localauthsession SET revoked_at = :now WHERE session_id = :session_id"
+)
+
+REVOKED_SESSIONS_SQL = """SELECT session_id, expires_at FROM localauthsession
+    WHERE revoked_at >= :since AND expires_at > :now"""
+
+CATALOG_VERSION_SQL = "SELECT version FROM catalog_version WHERE id = 1"
+
+PLAN_PAGE_SQL = """SELECT st.id, st.study_date,
+    COALESCE(st.study_date, st.examdate) AS date, st.subject,
+    COALESCE(st.hours, t.hours, 0) AS hours, st.status
+    FROM student_topics st
+    LEFT JOIN topics t ON t.id = st.topic_id
+    WHERE st.student_id = :user_id {after}
+    ORDER BY st.study_date, st.id
+    LIMIT :limit"""
+
+# Rows without a study_date sort first (NULLs lead in ascending order).
+PLAN_PAGE_AFTER_UNDATED = (
+    "AND ((st.study_date IS NULL AND st.id > :after_id) OR st.study_date IS NOT NULL)"
+)
+PLAN_PAGE_AFTER_DATED = """AND (st.study_date > :after_date
+    OR (st.study_date = :after_date AND st.id > :after_id))"""
+
+BOOKED_HOURS_SQL = """SELECT study_date, SUM(hours) AS hours FROM student_topics
+    WHERE student_id = :user_id AND study_date >= :start
+    AND (subject_id IS NULL OR subject_id <> :subject_id)
+    GROUP BY study_date"""
+
+SUBJECT_ROWS_SQL = """SELECT id, topic_id, study_date, hours, examdate, status
+    FROM student_topics WHERE student_id = :user_id AND subject_id = :subject_id"""
+
+MOVABLE_ROWS_SQL = """SELECT id, subject_id, topic_id, study_date, hours, level,
+    subject, examboard, examcode, examdate FROM student_topics
+    WHERE student_id = :user_id AND study_date >= :start
+    AND subject_id IS NOT NULL AND subject_id <> :subject_id
+    AND topic_id IS NOT NULL AND status = 'Not Started'"""
+
+DELETE_PLAN_SQL = "DELETE FROM student_topics WHERE student_id = :user_id"
@@ -0,0 +1,60 @@
+import sys
+from types import FrameType
+from typing import Optional
+
+import reflex as rx
+
+from app.db.instrumentation import install_query_listeners, query_source
+from app.monitoring.metrics import current_event
+
+# How far up the call stack to look for the state event handler.
+MAX_SOURCE_DEPTH = 8
+
+install_query_listeners()
+
+
+def _name(frame: FrameType) -> str:
+    # co_qualname is 3.11+; build "Class.method" from the bound self instead.
+    owner = frame.f_locals.get("self")
+    name = frame.f_code.co_name
+    return f"{type(owner).__name__}.{name}" if owner is not None else name
+
+
+def _source(frame: Optional[FrameType]) -> str:
+    """Qualified name of the nearest State method on the stack, else of the caller."""
+    caller = _name(frame) if frame else "other"
+    for _ in range(MAX_SOURCE_DEPTH):
+        if frame is None:
+            break
+        owner = frame.f_locals.get("self")
+        if owner is not None and type(owner).__name__.endswith("State"):
+            return _name(frame)
+        frame = frame.f_back
+    return caller
+
+
+class _SourcedSession:
+    """rx.asession() that attributes its statements to the code that opened it."""
+
+    def __init__(self, source: str):
+        self._source = source
+        self._session = rx.asession()
+
+    async def __aenter__(self):
+        self._token = query_source.set(self._source)
+        try:
+            return await self._session.__aenter__()
+        except BaseException:
+            query_source.reset(self._token)
+            raise
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._session.__aexit__(exc_type, exc, tb)
+        finally:
+            query_source.reset(self._token)
+
+
+def asession() -> _SourcedSession:
+    """Drop-in for rx.asession() whose queries are timed per calling handler."""
+    return _SourcedSession(current_event.get() or _source(sys._getframe(1)))
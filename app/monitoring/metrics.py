@@ -0,0 +1,180 @@
+import hmac
+import os
+import threading
+from contextvars import ContextVar
+from typing import Callable, Iterable, NamedTuple, Sequence, Union
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from app.monitoring.histogram import DEFAULT_BUCKETS, Histogram
+
+# Bearer token required by /metrics; without one only loopback clients may scrape.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Qualified name of the event handler being processed, e.g. "PlanState.load_plan".
+current_event: ContextVar[str] = ContextVar("current_event", default="")
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: dict[str, str]
+    value: Union[float, Histogram]
+
+
+Collector = Callable[[], Iterable[Sample]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _histogram_lines(
+    name: str, labels: dict[str, str], histogram: Histogram
+) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*histogram.buckets, float("inf")), histogram.counts):
+        cumulative += count
+        bucket_labels = _format_labels({**labels, "le": _format_bound(bound)})
+        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return lines
+
+
+class MetricsRegistry:
+    """Labelled counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._types: dict[str, str] = {}
+        self._help: dict[str, str] = {}
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, Histogram]] = {}
+        self._buckets: dict[str, Sequence[float]] = {}
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str) -> None:
+        self._types[name] = "counter"
+        self._help[name] = help
+        self._counters.setdefault(name, {})
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self._types[name] = "histogram"
+        self._help[name] = help
+        self._buckets[name] = buckets
+        self._histograms.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._counters[name]
+        with self._lock:
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._histograms[name]
+        histogram = series.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = series.setdefault(key, Histogram(self._buckets[name]))
+        histogram.observe(value)
+
+    def register(self, collector: Collector) -> None:
+        """Add a callback that reports current values at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for name, kind in self._types.items():
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for key, value in list(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(dict(key))} {value}")
+            else:
+                for key, histogram in list(self._histograms[name].items()):
+                    lines.extend(_histogram_lines(name, dict(key), histogram))
+        # A family may come from several collectors; its lines must stay together.
+        families: dict[str, list[Sample]] = {}
+        for collector in self._collectors:
+            for sample in collector():
+                families.setdefault(sample.name, []).append(sample)
+        for name, samples in families.items():
+            is_histogram = isinstance(samples[0].value, Histogram)
+            lines.append(f"# TYPE {name} {'histogram' if is_histogram else 'gauge'}")
+            for sample in samples:
+                if is_histogram:
+                    lines.extend(_histogram_lines(name, sample.labels, sample.value))
+                else:
+                    labels = _format_labels(sample.labels)
+                    lines.append(f"{name}{labels} {sample.value}")
+        return "\n".join(lines) + "\n"
+
+
+def stats_collector(prefix: str, stats: Callable[[], dict], **labels: str) -> Collector:
+    """Export the numeric entries of a stats() dict as gauges named prefix_key."""
+
+    def collect() -> Iterable[Sample]:
+        for key, value in stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield Sample(f"{prefix}_{key}", labels, value)
+
+    return collect
+
+
+registry = MetricsRegistry()
+registry.counter("reflex_events_total", "Event handler invocations.")
+registry.counter("reflex_event_errors_total", "Event handlers that raised.")
+registry.histogram("reflex_event_seconds", "Event handler wall time, including emits.")
+registry.histogram(
+    "reflex_state_lock_wait_seconds",
+    "Time background handlers waited for the state lock.",
+)
+registry.histogram(
+    "reflex_state_lock_hold_seconds", "Time background handlers held the state lock."
+)
+registry.histogram(
+    "reflex_state_delta_bytes",
+    "Encoded size of the state update frames sent to the client.",
+    BYTE_BUCKETS,
+)
+registry.histogram(
+    "reflex_state_serialized_bytes",
+    "Pickled size of each substate written to the state manager.",
+    BYTE_BUCKETS,
+)
+
+
+def _may_scrape(request: Request) -> bool:
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(
+            token.encode("utf-8"), METRICS_TOKEN.encode("utf-8")
+        )
+    return request.client is not None and request.client.host in LOOPBACK_HOSTS
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if not _may_scrape(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
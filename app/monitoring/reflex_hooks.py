@@ -0,0 +1,161 @@
+import logging
+import time
+
+from app.monitoring.metrics import current_event, registry
+from app.monitoring.tracing import current_span, tracer
+
+logger = logging.getLogger(__name__)
+
+_installed = False
+
+
+def _client_token(state) -> str:
+    try:
+        return state.router.session.client_token
+    except AttributeError:
+        return ""
+
+
+def _hook_event_processing() -> None:
+    from reflex.state import BaseState
+    from reflex.utils.format import format_event_handler
+
+    original = BaseState._process_event
+
+    async def _process_event(self, handler, state, payload):
+        name = handler.fn.__qualname__
+        client = _client_token(state)
+        span = tracer.start_event(name, client, format_event_handler(handler))
+        # Set in the task that emits the updates, so lock and delta metrics
+        # recorded while this generator is suspended carry the event name.
+        tokens = current_event.set(name), current_span.set(span)
+        start = time.perf_counter()
+        error = None
+        try:
+            async for update in original(self, handler, state, payload):
+                if span is not None:
+                    for event in update.events or ():
+                        tracer.expect_chain(span, client, event.name)
+                yield update
+        except Exception as e:
+            registry.inc("reflex_event_errors_total", event=name)
+            error = type(e).__name__
+            raise
+        finally:
+            registry.inc("reflex_events_total", event=name)
+            registry.observe(
+                "reflex_event_seconds", time.perf_counter() - start, event=name
+            )
+            if span is not None:
+                tracer.finish(span, error)
+            try:
+                current_event.reset(tokens[0])
+                current_span.reset(tokens[1])
+            except ValueError:
+                # Closed from another context, e.g. by garbage collection.
+                pass
+
+    BaseState._process_event = _process_event
+
+
+def _hook_state_lock() -> None:
+    from reflex.istate.proxy import StateProxy
+
+    original_enter = StateProxy.__aenter__
+    original_exit = StateProxy.__aexit__
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        result = await original_enter(self)
+        acquired = time.perf_counter()
+        registry.observe(
+            "reflex_state_lock_wait_seconds",
+            acquired - start,
+            event=current_event.get() or "other",
+        )
+        # wrapt forwards attribute writes to the state unless prefixed _self_.
+        self._self_lock_acquired = acquired
+        return result
+
+    async def __aexit__(self, *exc_info):
+        try:
+            return await original_exit(self, *exc_info)
+        finally:
+            acquired = getattr(self, "_self_lock_acquired", None)
+            if acquired is not None:
+                self._self_lock_acquired = None
+                registry.observe(
+                    "reflex_state_lock_hold_seconds",
+                    time.perf_counter() - acquired,
+                    event=current_event.get() or "other",
+                )
+
+    StateProxy.__aenter__ = __aenter__
+    StateProxy.__aexit__ = __aexit__
+
+
+def _hook_delta_size() -> None:
+    from reflex.constants import SocketEvent
+    from socketio.packet import EVENT, Packet
+
+    original = Packet.encode
+    event_name = str(SocketEvent.EVENT)
+
+    def encode(self):
+        # Size the frame Socket.IO already encodes rather than encoding the
+        # update a second time. emit_update sends it from a task created in
+        # the handler's context, so current_event still names the handler.
+        encoded = original(self)
+        data = self.data
+        if (
+            self.packet_type == EVENT
+            and isinstance(data, list)
+            and data
+            and data[0] == event_name
+            and isinstance(encoded, str)
+        ):
+            registry.observe(
+                "reflex_state_delta_bytes",
+                len(encoded),
+                event=current_event.get() or "other",
+            )
+        return encoded
+
+    Packet.encode = encode
+
+
+def _hook_serialized_size() -> None:
+    from reflex.state import BaseState
+
+    original = BaseState._serialize
+
+    def _serialize(self) -> bytes:
+        payload = original(self)
+        registry.observe(
+            "reflex_state_serialized_bytes", len(payload), state=self.get_full_name()
+        )
+        return payload
+
+    BaseState._serialize = _serialize
+
+
+def install_reflex_hooks() -> None:
+    """Wrap Reflex internals to feed the handler, lock, delta and state size metrics.
+
+    Each hook targets a private Reflex API; one that no longer fits is
+    skipped with a warning instead of breaking the app.
+    """
+    global _installed
+    if _installed:
+        return
+    for hook in (
+        _hook_event_processing,
+        _hook_state_lock,
+        _hook_delta_size,
+        _hook_serialized_size,
+    ):
+        try:
+            hook()
+        except (ImportError, AttributeError):
+            logger.warning("Metrics hook %s is unavailable", hook.__name__)
+    _installed = True
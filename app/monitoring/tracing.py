@@ -0,0 +1,248 @@
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUP_COUNT = int(os.environ.get("TRACE_BACKUP_COUNT", "5"))
+# How long a yielded event waits for the client to send it back.
+CHAIN_TTL = 30.0
+MAX_PENDING_CHAINS = 10_000
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start",
+        "duration",
+        "attrs",
+        "children",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        parent_id: Optional[str],
+        name: str,
+        kind: str,
+        start: Optional[float] = None,
+        duration: float = 0.0,
+        **attrs: Any,
+    ):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time() if start is None else start
+        self.duration = duration
+        self.attrs = attrs
+        self.children: list[Span] = []
+
+    def to_dict(self) -> dict:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            **self.attrs,
+        }
+        if self.children:
+            record["children"] = [child.to_dict() for child in self.children]
+        return record
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Samples root events, links chained events and writes finished spans."""
+
+    def __init__(
+        self,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        path: str = TRACE_FILE,
+        max_bytes: int = TRACE_MAX_BYTES,
+        backup_count: int = TRACE_BACKUP_COUNT,
+    ):
+        self.sample_rate = sample_rate
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.written = 0
+        # (client token, event name) -> (deadline, trace_id, parent span_id)
+        self._chains: OrderedDict[tuple[str, str], tuple[float, str, str]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+
+    def _claim_chain(self, token: str, event: str) -> Optional[tuple[str, str]]:
+        with self._lock:
+            link = self._chains.pop((token, event), None)
+        if link is None or link[0] < time.monotonic():
+            return None
+        return link[1], link[2]
+
+    def start_event(self, name: str, token: str, event: str) -> Optional[Span]:
+        """Span for an event handler, or None if its trace is not sampled."""
+        link = self._claim_chain(token, event)
+        if link is not None:
+            trace_id, parent_id = link
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trace_id, parent_id = uuid.uuid4().hex, None
+        else:
+            return None
+        return Span(trace_id, parent_id, name, "event", client=token[:8])
+
+    def expect_chain(self, span: Span, token: str, event: str) -> None:
+        """Record that span yielded event, so its arrival joins the trace."""
+        span.children.append(
+            Span(span.trace_id, span.span_id, event.rsplit(".", 1)[-1], "chain")
+        )
+        with self._lock:
+            self._chains[(token, event)] = (
+                time.monotonic() + CHAIN_TTL,
+                span.trace_id,
+                span.span_id,
+            )
+            while len(self._chains) > MAX_PENDING_CHAINS:
+                self._chains.popitem(last=False)
+
+    def record_db(self, statement: str, start: float, duration: float, rows: int):
+        parent = current_span.get()
+        if parent is not None:
+            parent.children.append(
+                Span(
+                    parent.trace_id,
+                    parent.span_id,
+                    statement,
+                    "db",
+                    start=start,
+                    duration=duration,
+                    rows=rows,
+                )
+            )
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            logger = logging.getLogger("app.monitoring.traces")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def finish(self, span: Span, error: Optional[str] = None) -> None:
+        span.duration = time.time() - span.start
+        if error:
+            span.attrs["error"] = error
+        self._get_logger().info(json.dumps(span.to_dict()))
+        self.written += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"written": self.written, "pending_chains": len(self._chains)}
+
+
+tracer = Tracer()
+
+
+def _load_spans(paths: list[str]) -> dict[str, dict]:
+    spans: dict[str, dict] = {}
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                spans[record["span_id"]] = record
+    return spans
+
+
+def critical_path(
+    span_id: str, spans: dict, children: dict
+) -> tuple[list[str], float]:
+    """Names along the chain of latest-ending descendants, and its end time."""
+    span = spans[span_id]
+    path = [f"{span['kind']}:{span['name']}"]
+    end = span["start"] + span["duration_ms"] / 1000
+    leaves = [
+        (c["start"] + c["duration_ms"] / 1000, [f"{c['kind']}:{c['name']}"])
+        for c in span.get("children", ())
+        if c["kind"] == "db"
+    ]
+    for child_id in children.get(span_id, ()):
+        child_path, child_end = critical_path(child_id, spans, children)
+        leaves.append((child_end, child_path))
+    if leaves:
+        last_end, last_path = max(leaves, key=lambda leaf: leaf[0])
+        path += last_path
+        end = max(end, last_end)
+    return path, end
+
+
+def summarize(paths: list[str], top: int) -> None:
+    spans = _load_spans(paths)
+    children: dict[str, list[str]] = {}
+    roots = []
+    for span_id, span in spans.items():
+        parent = span.get("parent_id")
+        if parent in spans:
+            children.setdefault(parent, []).append(span_id)
+        else:
+            roots.append(span_id)
+    traces = []
+    for root_id in roots:
+        path, end = critical_path(root_id, spans, children)
+        traces.append((end - spans[root_id]["start"], path))
+    traces.sort(key=lambda trace: trace[0], reverse=True)
+
+    by_path: dict[tuple[str, ...], list[float]] = {}
+    for total, path in traces:
+        by_path.setdefault(tuple(path), []).append(total)
+    print(f"{len(traces)} traces from {len(spans)} event spans\n")
+    print(f"{'count':>6} {'p50 ms':>9} {'max ms':>9}  critical path")
+    ranked = sorted(by_path.items(), key=lambda item: max(item[1]), reverse=True)
+    for path, totals in ranked[:top]:
+        totals.sort()
+        p50 = totals[len(totals) // 2] * 1000
+        worst = totals[-1] * 1000
+        print(f"{len(totals):>6} {p50:>9.1f} {worst:>9.1f}  " + " -> ".join(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize critical paths in trace files (newest and rotated)."
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    summarize(args.paths, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,35 @@
 import reflex as rx
 from typing import Optional
-import bcrypt
+import logging
 import uuid
 from datetime import datetime, timedelta
 from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError
+from app.db.queries import LOGIN_USER_SQL, RESOLVE_SESSION_SQL, REVOKE_SESSION_SQL
+from app.db.session import asession
 from pydantic import BaseModel
+from app.pages.auth.hydration import hydration_coordinator
+from app.pages.auth.password_hasher import PasswordHasherBusy, password_hasher
+from app.pages.auth.rate_limit import admit_auth_attempt
+from app.pages.auth.session_cache import session_cache, seconds_until
+from app.pages.auth.session_tokens import (
+    SessionClaims,
+    is_signed_token,
+    revocations,
+    sign_session_token,
+    signed_tokens_enabled,
+    verify_session_token,
+)
+
+logger = logging.getLogger(__name__)
+
+TOO_MANY_ATTEMPTS = "Too many attempts. Please wait a moment and try again."
+SERVER_BUSY = "Server is busy. Please try again shortly."
+SESSION_LIFETIME = timedelta(hours=24)
+REGISTRATION_FAILED = "Registration failed. Please check your details and try again."
+# localuser.username and userinfo.email are VARCHAR(255) after migration 2.
+MAX_USERNAME_LENGTH = 255
+MAX_EMAIL_LENGTH = 255
 
 
 class User(BaseModel):
@@ -19,172 +44,294 @@ class AuthState(rx.State):
     error_message: str = ""
     current_user: Optional[User] = None
     is_hydrated: bool = False
+    session_token: str = rx.Cookie(
+        "", name="session_id", max_age=int(SESSION_LIFETIME.total_seconds())
+    )
 
     @rx.var
     def is_authenticated(self) -> bool:
         return self.current_user is not None
 
-    def _hash_password(self, password: str) -> bytes:
-        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-
-    def _verify_password(self, password: str, hashed_password: bytes) -> bool:
-        return bcrypt.checkpw(password.encode("utf-8"), hashed_password)
-
     @rx.event(background=True)
     async def handle_registration(self, form_data: dict):
         username = form_data.get("username")
         email = form_data.get("email")
         password = form_data.get("password")
         confirm_password = form_data.get("confirm_password")
+        if not admit_auth_attempt(self.router.session.client_ip, username):
+            async with self:
+                self.error_message = TOO_MANY_ATTEMPTS
+            return
         async with self:
             if password != confirm_password:
                 self.error_message = "Passwords do not match."
                 return
-            if len(password) < 8:
+            if not password or len(password) < 8:
                 self.error_message = "Password must be at least 8 characters long."
                 return
             self.error_message = ""
-        hashed_password = self._hash_password(password)
-        async with rx.asession() as session:
-            async with session.begin():
-                result_user = await session.execute(
-                    text("SELECT id FROM localuser WHERE username = :username"),
-                    {"username": username},
-                )
-                if result_user.first():
-                    async with self:
-                        self.error_message = "Username already exists."
-                    return
-                result_email = await session.execute(
-                    text("SELECT user_id FROM userinfo WHERE email = :email"),
-                    {"email": email},
-                )
-                if result_email.first():
-                    async with self:
-                        self.error_message = "Email already registered."
-                    return
-                await session.execute(
-                    text(
-                        "INSERT INTO localuser (username, password_hash, enabled) VALUES (:username, :password, :enabled)"
-                    ),
-                    {"username": username, "password": hashed_password, "enabled": 1},
-                )
-                result = await session.execute(text("SELECT LAST_INSERT_ID() as id"))
-                new_user_id = result.scalar_one()
-                await session.execute(
-                    text(
-                        "INSERT INTO userinfo (email, user_id, created_at, updated_at) VALUES (:email, :user_id, :created, :updated)"
-                    ),
-                    {
-                        "email": email,
-                        "user_id": new_user_id,
-                        "created": datetime.utcnow().isoformat(),
-                        "updated": datetime.utcnow().isoformat(),
-                    },
-                )
+        try:
+            error = await register_user(username, email, password)
+        except PasswordHasherBusy:
+            error = SERVER_BUSY
+        if error:
+            async with self:
+                self.error_message = error
+            return
         return rx.redirect("/login")
 
     @rx.event(background=True)
     async def handle_login(self, form_data: dict):
         username = form_data.get("username")
         password = form_data.get("password")
+        if not admit_auth_attempt(self.router.session.client_ip, username):
+            async with self:
+                self.error_message = TOO_MANY_ATTEMPTS
+            return
         async with self:
             self.error_message = ""
-        async with rx.asession() as session:
-            result = await session.execute(
-                text(
-                    "SELECT id, password_hash FROM localuser WHERE username = :username"
-                ),
-                {"username": username},
-            )
-            user_row = result.first()
-            if user_row and self._verify_password(password, user_row.password_hash):
-                user_id = user_row.id
-                session_id = str(uuid.uuid4())
-                expiration = (datetime.utcnow() + timedelta(hours=24)).isoformat()
-                await session.execute(
-                    text(
-                        "INSERT INTO localauthsession (user_id, session_id, expiration) VALUES (:user_id, :session_id, :expiration)"
-                    ),
-                    {
-                        "user_id": user_id,
-                        "session_id": session_id,
-                        "expiration": expiration,
-                    },
-                )
-                await session.commit()
-                return rx.redirect("/authenticated_home")
-            else:
-                async with self:
-                    self.error_message = "Invalid username or password."
+        try:
+            login = await authenticate(username, password)
+        except PasswordHasherBusy:
+            async with self:
+                self.error_message = SERVER_BUSY
+            return
+        if login is None:
+            async with self:
+                self.error_message = "Invalid username or password."
+            return
+        async with self:
+            self.current_user, self.session_token = login
+        return rx.redirect("/authenticated_home")
 
     @rx.event(background=True)
     async def handle_logout(self):
-        session_id = self.router.cookies.get("session_id")
+        token = self.session_token
+        session_id = token
+        if token and is_signed_token(token):
+            # None outside hmac mode, so a forged token revokes nothing.
+            claims = verify_session_token(token)
+            session_id = claims.session_id if claims else None
+            if claims:
+                revocations.add(claims.session_id, claims.expires_at)
         if session_id:
-            async with rx.asession() as session:
+            # Revoked rows stay until they expire so other workers can sync them.
+            async with asession() as session:
                 await session.execute(
-                    text("DELETE FROM localauthsession WHERE session_id = :session_id"),
-                    {"session_id": session_id},
+                    text(REVOKE_SESSION_SQL),
+                    {"session_id": session_id, "now": datetime.utcnow()},
                 )
                 await session.commit()
+        if token:
+            session_cache.invalidate(token)
         yield rx.remove_cookie("session_id")
         async with self:
             self.current_user = None
+            self.session_token = ""
         yield rx.redirect("/")
         return
 
+    def _hydration_redirect(self) -> Optional[rx.event.EventSpec]:
+        if self.router.page.path == "/plan" and (not self.is_authenticated):
+            return rx.redirect("/login")
+        if self.router.page.path in ["/login", "/signup"] and self.is_authenticated:
+            return rx.redirect("/plan")
+        return None
+
     @rx.event(background=True)
     async def hydrate_user(self, _=None):
         """Check for a valid session and hydrate the current_user."""
         async with self:
             if self.is_hydrated:
-                if self.router.page.path == "/plan" and (not self.is_authenticated):
-                    yield rx.redirect("/login")
-                    return
-                elif (
-                    self.router.page.path in ["/login", "/signup"]
-                    and self.is_authenticated
-                ):
-                    yield rx.redirect("/plan")
-                    return
-                yield
+                yield self._hydration_redirect()
                 return
-            session_id = self.router.cookies.get("session_id")
+            session_id = self.session_token
+            client_token = self.router.session.client_token
+        resolved = None
+        if session_id:
+            resolved = await hydration_coordinator.run(
+                f"{client_token}:{session_id}", lambda: resolve_session(session_id)
+            )
+        async with self:
             if session_id:
-                async with rx.asession() as session:
-                    result = await session.execute(
-                        text("""
-                        SELECT u.id, u.username, i.email, s.expiration
-                        FROM localuser u
-                        JOIN localauthsession s ON u.id = s.user_id
-                        JOIN userinfo i ON u.id = i.user_id
-                        WHERE s.session_id = :session_id
-                        """),
-                        {"session_id": session_id},
-                    )
-                    user_row = result.first()
-                if (
-                    user_row
-                    and user_row.expiration
-                    and (
-                        datetime.fromisoformat(user_row.expiration) > datetime.utcnow()
-                    )
-                ):
-                    self.current_user = User(
-                        id=user_row.id, username=user_row.username, email=user_row.email
-                    )
+                if resolved and resolved[1] > datetime.utcnow():
+                    self.current_user = resolved[0]
                 else:
-                    yield rx.remove_cookie("session_id")
                     self.current_user = None
-            async with self:
-                self.is_hydrated = True
-            if self.router.page.path == "/plan" and (not self.is_authenticated):
-                yield rx.redirect("/login")
-                return
-            elif (
-                self.router.page.path in ["/login", "/signup"] and self.is_authenticated
-            ):
-                yield rx.redirect("/plan")
-                return
-        yield
\ No newline at end of file
+            self.is_hydrated = True
+            clear_cookie = bool(session_id) and self.current_user is None
+            if clear_cookie:
+                self.session_token = ""
+            redirect = self._hydration_redirect()
+        if clear_cookie:
+            yield rx.remove_cookie("session_id")
+        yield redirect
+
+
+async def register_user(username: str, email: str, password: str) -> Optional[str]:
+    """Create the account, returning an error message if it cannot be created."""
+    error = _registration_input_error(username, email)
+    if error:
+        return error
+    hashed_password = await password_hasher.hash(password)
+    now = datetime.utcnow().isoformat()
+    try:
+        async with asession() as session:
+            async with session.begin():
+                result = await session.execute(
+                    text(
+                        "INSERT INTO localuser (username, password_hash, enabled) VALUES (:username, :password, :enabled)"
+                    ),
+                    {"username": username, "password": hashed_password, "enabled": 1},
+                )
+                await session.execute(
+                    text(
+                        "INSERT INTO userinfo (email, user_id, created_at, updated_at) VALUES (:email, :user_id, :created, :updated)"
+                    ),
+                    {
+                        "email": email,
+                        "user_id": result.lastrowid,
+                        "created": now,
+                        "updated": now,
+                    },
+                )
+    except IntegrityError as e:
+        message = _registration_conflict_message(e)
+        if message is None:
+            logger.exception("Registration failed for %r", username)
+            return REGISTRATION_FAILED
+        return message
+    except DataError:
+        logger.exception("Registration failed for %r", username)
+        return REGISTRATION_FAILED
+    return None
+
+
+async def authenticate(username: str, password: str) -> Optional[tuple[User, str]]:
+    """Check the credentials and open a session, returning the user and cookie value."""
+    async with asession() as session:
+        result = await session.execute(text(LOGIN_USER_SQL), {"username": username})
+        user_row = result.first()
+        if not user_row or not await password_hasher.verify(
+            password, user_row.password_hash
+        ):
+            return None
+        if password_hasher.needs_rehash(user_row.password_hash):
+            try:
+                await session.execute(
+                    text(
+                        "UPDATE localuser SET password_hash = :password WHERE id = :user_id"
+                    ),
+                    {
+                        "password": await password_hasher.hash(password),
+                        "user_id": user_row.id,
+                    },
+                )
+            except PasswordHasherBusy:
+                pass  # Retried on the next successful login.
+        session_id = str(uuid.uuid4())
+        expires_at = datetime.utcnow() + SESSION_LIFETIME
+        await session.execute(
+            text(
+                "INSERT INTO localauthsession (user_id, session_id, expiration, expires_at) VALUES (:user_id, :session_id, :expiration, :expires_at)"
+            ),
+            {
+                "user_id": user_row.id,
+                "session_id": session_id,
+                "expiration": expires_at.isoformat(),
+                "expires_at": expires_at,
+            },
+        )
+        await session.commit()
+    user = User(id=user_row.id, username=username, email=user_row.email)
+    if not signed_tokens_enabled():
+        return user, session_id
+    token = sign_session_token(
+        SessionClaims(
+            user_id=user.id,
+            username=user.username,
+            email=user.email,
+            session_id=session_id,
+            expires_at=expires_at,
+        )
+    )
+    return user, token
+
+
+async def resolve_session(session_id: str) -> Optional[tuple[User, datetime]]:
+    if is_signed_token(session_id):
+        # A dotted cookie is never an opaque session id; outside hmac mode it
+        # is rejected rather than looked up.
+        if not signed_tokens_enabled():
+            return None
+        return await _resolve_signed_token(session_id)
+    cached = session_cache.get(session_id)
+    if cached is not None:
+        # A logout on another worker only clears that worker's cache; the
+        # shared revocation list is what reaches this one.
+        await revocations.refresh()
+        if revocations.is_revoked(session_id):
+            session_cache.invalidate(session_id)
+            return None
+        return cached
+    async with asession() as session:
+        result = await session.execute(
+            text(RESOLVE_SESSION_SQL),
+            {"session_id": session_id, "now": datetime.utcnow()},
+        )
+        user_row = result.first()
+    if not user_row:
+        return None
+    expiration = _as_datetime(user_row.expires_at)
+    resolved = (
+        User(id=user_row.id, username=user_row.username, email=user_row.email),
+        expiration,
+    )
+    session_cache.put(session_id, resolved, ttl=seconds_until(expiration))
+    return resolved
+
+
+async def _resolve_signed_token(token: str) -> Optional[tuple[User, datetime]]:
+    """Validate a signed token without touching the database on the hot path."""
+    claims = verify_session_token(token)
+    if claims is None:
+        return None
+    await revocations.refresh()
+    if revocations.is_revoked(claims.session_id):
+        return None
+    return (
+        User(id=claims.user_id, username=claims.username, email=claims.email),
+        claims.expires_at,
+    )
+
+
+def _registration_input_error(
+    username: Optional[str], email: Optional[str]
+) -> Optional[str]:
+    if not username or not username.strip():
+        return "Username is required."
+    if not email or not email.strip():
+        return "Email is required."
+    if len(username) > MAX_USERNAME_LENGTH:
+        return f"Username must be at most {MAX_USERNAME_LENGTH} characters."
+    if len(email) > MAX_EMAIL_LENGTH:
+        return f"Email must be at most {MAX_EMAIL_LENGTH} characters."
+    return None
+
+
+def _registration_conflict_message(error: IntegrityError) -> Optional[str]:
+    """Message for a duplicate username or email; None for any other violation."""
+    # MySQL names the violated index, SQLite names the column.
+    message = str(error.orig)
+    if "UNIQUE" not in message.upper() and "Duplicate entry" not in message:
+        return None
+    if "ux_userinfo_email" in message or "userinfo.email" in message:
+        return "Email already registered."
+    if "ux_localuser_username" in message or "localuser.username" in message:
+        return "Username already exists."
+    return None
+
+
+def _as_datetime(value) -> datetime:
+    # SQLite hands DATETIME columns back as strings.
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
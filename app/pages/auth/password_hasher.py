@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+import bcrypt
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.db.session import asession
+from app.monitoring.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password work queue is full."""
+
+
+def _hash(password: bytes, rounds: int) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, time.perf_counter() - start
+
+
+def _verify(password: bytes, hashed_password: bytes) -> tuple[bool, float]:
+    start = time.perf_counter()
+    ok = bcrypt.checkpw(password, hashed_password)
+    return ok, time.perf_counter() - start
+
+
+def hash_rounds(hashed_password: bytes) -> Optional[int]:
+    """Cost factor of a modular-crypt bcrypt hash such as b"$2b$12$..."."""
+    try:
+        return int(hashed_password.split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(budget: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """Highest cost factor whose hash time stays within budget seconds.
+
+    Each extra round doubles the work, so timing stops at the first cost over
+    budget. The result never drops below min_rounds.
+    """
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        _, elapsed = _hash(b"calibration password", rounds)
+        if elapsed > budget:
+            break
+        chosen = rounds
+    return chosen
+
+
+class PasswordHasher:
+    """Runs bcrypt work on a thread or process pool with a bounded queue."""
+
+    def __init__(
+        self, kind: str = "thread", workers: Optional[int] = None, max_queue: int = 64
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hasher executor: {kind!r}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.pending = 0
+        self.peak_pending = 0
+        self.rejected = 0
+        self.rounds = DEFAULT_ROUNDS
+        # Until the shared cost is known, stored hashes are left alone.
+        self.calibrated = False
+        self.hash_seconds = Histogram()
+        self.verify_seconds = Histogram()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted jobs still waiting for a free worker."""
+        return max(self.pending - self.workers, 0)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> bytes:
+        hashed, elapsed = await self._submit(
+            _hash, password.encode("utf-8"), self.rounds
+        )
+        self.hash_seconds.observe(elapsed)
+        return hashed
+
+    async def verify(self, password: str, hashed_password: bytes) -> bool:
+        ok, elapsed = await self._submit(
+            _verify, password.encode("utf-8"), hashed_password
+        )
+        self.verify_seconds.observe(elapsed)
+        return ok
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        return self.calibrated and hash_rounds(hashed_password) != self.rounds
+
+    async def calibrate(self, budget: float, min_rounds: int = 10) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), calibrate_rounds, budget, min_rounds
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "peak_pending": self.peak_pending,
+            "rejected": self.rejected,
+            "rounds": self.rounds,
+            "calibrated": int(self.calibrated),
+            "hash_seconds": self.hash_seconds.snapshot(),
+            "verify_seconds": self.verify_seconds.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    kind=os.environ.get("PASSWORD_HASH_EXECUTOR", "thread"),
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "0")) or None,
+    max_queue=int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64")),
+)
+
+
+async def _shared_rounds() -> Optional[int]:
+    async with asession() as session:
+        result = await session.execute(
+            text("SELECT rounds FROM password_hash_config WHERE id = 1")
+        )
+        return result.scalar()
+
+
+async def _publish_rounds(rounds: int) -> int:
+    """Store rounds as the shared cost unless another worker already did."""
+    try:
+        async with asession() as session:
+            await session.execute(
+                text(
+                    "INSERT INTO password_hash_config (id, rounds, calibrated_at) VALUES (1, :rounds, :now)"
+                ),
+                {"rounds": rounds, "now": datetime.utcnow().isoformat()},
+            )
+            await session.commit()
+    except IntegrityError:
+        return await _shared_rounds() or rounds
+    return rounds
+
+
+async def calibrate_password_hasher():
+    """Pick the bcrypt cost once per deployment and share it between workers.
+
+    The first worker to start times bcrypt and stores the cost in
+    password_hash_config; the others use the stored value, so timing noise
+    cannot leave workers rehashing each other's hashes. Delete the row to
+    calibrate again on the next start.
+    """
+    fixed_rounds = os.environ.get("PASSWORD_HASH_ROUNDS")
+    if fixed_rounds:
+        password_hasher.rounds = int(fixed_rounds)
+        password_hasher.calibrated = True
+        return
+    budget = float(os.environ.get("PASSWORD_HASH_BUDGET_MS", "250")) / 1000
+    min_rounds = int(os.environ.get("PASSWORD_HASH_MIN_ROUNDS", "10"))
+    try:
+        rounds = await _shared_rounds()
+        if rounds is None:
+            rounds = await _publish_rounds(
+                await password_hasher.calibrate(budget, min_rounds)
+            )
+    except SQLAlchemyError:
+        # Without the shared row the workers could disagree; keep the default
+        # cost and leave existing hashes as they are.
+        logger.warning("password_hash_config is unavailable; not rehashing")
+        return
+    password_hasher.rounds = rounds
+    password_hasher.calibrated = True
+    logger.info("Using bcrypt cost %d for a %.0f ms budget", rounds, budget * 1000)
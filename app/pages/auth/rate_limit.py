@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets with LRU eviction of idle keys."""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 100_000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        # key -> [tokens, last_update]
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                bucket[0] = min(
+                    self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second
+                )
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                self.allowed += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+ip_limiter = TokenBucketLimiter(
+    capacity=float(os.environ.get("AUTH_RATE_LIMIT_IP_BURST", "30")),
+    refill_per_second=float(os.environ.get("AUTH_RATE_LIMIT_IP_PER_MINUTE", "30")) / 60,
+)
+username_limiter = TokenBucketLimiter(
+    capacity=float(os.environ.get("AUTH_RATE_LIMIT_USER_BURST", "5")),
+    refill_per_second=float(os.environ.get("AUTH_RATE_LIMIT_USER_PER_MINUTE", "5"))
+    / 60,
+)
+
+
+def admit_auth_attempt(client_ip: Optional[str], username: Optional[str]) -> bool:
+    if client_ip and not ip_limiter.allow(client_ip):
+        return False
+    if username and not username_limiter.allow(username.lower()):
+        return False
+    return True
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.db.session import asession
+
+logger = logging.getLogger(__name__)
+
+SESSION_REAPER_INTERVAL = float(os.environ.get("SESSION_REAPER_INTERVAL", "300"))
+SESSION_REAPER_BATCH_SIZE = int(os.environ.get("SESSION_REAPER_BATCH_SIZE", "1000"))
+
+
+async def reap_expired_sessions(batch_size: int = SESSION_REAPER_BATCH_SIZE) -> int:
+    """Delete expired sessions in batches, committing after each one."""
+    total = 0
+    while True:
+        async with asession() as session:
+            result = await session.execute(
+                text("""
+                DELETE FROM localauthsession WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id FROM localauthsession
+                        WHERE expires_at < :now
+                        ORDER BY expires_at
+                        LIMIT :batch_size
+                    ) AS expired
+                )
+                """),
+                {"now": datetime.utcnow(), "batch_size": batch_size},
+            )
+            await session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+        await asyncio.sleep(0)
+
+
+async def session_reaper_task():
+    while True:
+        try:
+            deleted = await reap_expired_sessions()
+            if deleted:
+                logger.info("Reaped %d expired sessions", deleted)
+        except Exception:
+            logger.exception("Session reaper failed")
+        await asyncio.sleep(SESSION_REAPER_INTERVAL)
@@ -0,0 +1,162 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import text
+
+from app.db.queries import REVOKED_SESSIONS_SQL
+from app.db.session import asession
+
+SESSION_TOKEN_SECRET = os.environ.get("SESSION_TOKEN_SECRET", "").encode("utf-8")
+SESSION_TOKEN_MODE = os.environ.get("SESSION_TOKEN_MODE", "opaque")
+REVOCATION_SYNC_INTERVAL = float(os.environ.get("SESSION_REVOCATION_SYNC", "5"))
+# HMAC-SHA256 keys shorter than the digest weaken the signature.
+MIN_SECRET_BYTES = 32
+
+
+class SessionClaims(NamedTuple):
+    user_id: int
+    username: str
+    email: str
+    session_id: str
+    expires_at: datetime
+
+
+def check_token_config(mode: str, secret: bytes) -> None:
+    """Refuse to run with a token mode that cannot be used safely."""
+    if mode not in ("opaque", "hmac"):
+        raise RuntimeError(
+            f"SESSION_TOKEN_MODE must be 'opaque' or 'hmac', not {mode!r}"
+        )
+    if mode == "hmac" and len(secret) < MIN_SECRET_BYTES:
+        raise RuntimeError(
+            f"SESSION_TOKEN_MODE=hmac needs a SESSION_TOKEN_SECRET of at least "
+            f"{MIN_SECRET_BYTES} bytes"
+        )
+
+
+check_token_config(SESSION_TOKEN_MODE, SESSION_TOKEN_SECRET)
+
+
+def signed_tokens_enabled() -> bool:
+    return SESSION_TOKEN_MODE == "hmac"
+
+
+def is_signed_token(value: str) -> bool:
+    # Opaque session ids are uuid4 strings and never contain a dot.
+    return "." in value
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(body: str) -> str:
+    return _b64encode(
+        hmac.new(SESSION_TOKEN_SECRET, body.encode("utf-8"), hashlib.sha256).digest()
+    )
+
+
+def sign_session_token(claims: SessionClaims) -> str:
+    payload = {
+        "uid": claims.user_id,
+        "usr": claims.username,
+        "eml": claims.email,
+        "sid": claims.session_id,
+        "exp": int((claims.expires_at - datetime(1970, 1, 1)).total_seconds()),
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_signature(body)}"
+
+
+def verify_session_token(token: str) -> Optional[SessionClaims]:
+    """Return the token's claims if the signature is valid and it has not expired.
+
+    Signed tokens are only honoured in hmac mode; otherwise they are invalid.
+    """
+    if not signed_tokens_enabled():
+        return None
+    body, _, signature = token.partition(".")
+    if not signature:
+        return None
+    try:
+        # Compare bytes: a cookie can carry any characters, and both the ascii
+        # encode and compare_digest on a non-ASCII str would raise.
+        expected = _signature(body).encode("ascii")
+        if not hmac.compare_digest(signature.encode("utf-8"), expected):
+            return None
+        payload = json.loads(_b64decode(body))
+        claims = SessionClaims(
+            user_id=int(payload["uid"]),
+            username=payload["usr"],
+            email=payload["eml"],
+            session_id=payload["sid"],
+            expires_at=datetime(1970, 1, 1) + timedelta(seconds=payload["exp"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+    if claims.expires_at <= datetime.utcnow():
+        return None
+    return claims
+
+
+class RevocationList:
+    """Revoked session ids, mirrored from localauthsession.revoked_at.
+
+    Each worker polls for rows revoked since its last sync, so a logout on one
+    worker is seen by the others within the sync interval. Entries drop out once
+    the session would have expired anyway.
+    """
+
+    def __init__(self, sync_interval: float = REVOCATION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, datetime] = {}
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._lock = asyncio.Lock()
+
+    def add(self, session_id: str, expires_at: datetime) -> None:
+        self._revoked[session_id] = expires_at
+
+    def is_revoked(self, session_id: str) -> bool:
+        return session_id in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    async def refresh(self) -> None:
+        if time.monotonic() < self._next_sync:
+            return
+        async with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            now = datetime.utcnow()
+            # Overlap the window slightly so clock skew between workers is harmless.
+            since = (self._synced_at or datetime(1970, 1, 1)) - timedelta(seconds=5)
+            async with asession() as session:
+                result = await session.execute(
+                    text(REVOKED_SESSIONS_SQL), {"since": since, "now": now}
+                )
+                for row in result.fetchall():
+                    expires_at = row.expires_at
+                    if isinstance(expires_at, str):
+                        expires_at = datetime.fromisoformat(expires_at)
+                    self._revoked[row.session_id] = expires_at
+            self._revoked = {
+                sid: exp for sid, exp in self._revoked.items() if exp > now
+            }
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_interval
+
+
+revocations = RevocationList()
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+from typing import Optional, TypedDict
+
+from sqlalchemy import text
+
+from app.db.queries import CATALOG_VERSION_SQL
+from app.db.session import asession
+
+CATALOG_VERSION_CHECK_INTERVAL = float(
+    os.environ.get("CATALOG_VERSION_CHECK_INTERVAL", "30")
+)
+
+
+class Subject(TypedDict):
+    id: int
+    subject: str
+    examcode: str
+    examdate: str
+
+
+class Topic(TypedDict):
+    id: int
+    topic: str
+    size: str
+    hours: int
+
+
+class CatalogIndex:
+    """Read-only Level -> Board -> Subject -> Topic lookup built from one snapshot."""
+
+    def __init__(self, version: int, subject_rows: list, topic_rows: list):
+        self.version = version
+        self.subjects_by_level: dict[str, dict[str, list[Subject]]] = {}
+        self.subjects_by_id: dict[int, Subject] = {}
+        self.topics_by_subject: dict[int, list[Topic]] = {}
+        for r in sorted(subject_rows, key=lambda r: r.subject or ""):
+            if r.level is None or r.board is None:
+                continue
+            subject = Subject(
+                id=r.id, subject=r.subject, examcode=r.examcode, examdate=r.examdate
+            )
+            boards = self.subjects_by_level.setdefault(r.level, {})
+            boards.setdefault(r.board, []).append(subject)
+            self.subjects_by_id[r.id] = subject
+        for r in sorted(topic_rows, key=lambda r: r.topic or ""):
+            self.topics_by_subject.setdefault(r.subjectid, []).append(
+                Topic(id=r.id, topic=r.topic, size=r.size, hours=r.hours)
+            )
+        self.levels = sorted(self.subjects_by_level)
+        self._boards = {
+            level: sorted(boards) for level, boards in self.subjects_by_level.items()
+        }
+        # Per-subject views derived on first use; shared by every session.
+        self._topic_hours: dict[int, dict[int, int]] = {}
+        self._topic_sizes: dict[int, list[str]] = {}
+
+    def boards(self, level: str) -> list[str]:
+        return self._boards.get(level, [])
+
+    def subjects(self, level: str, board: str) -> list[Subject]:
+        return self.subjects_by_level.get(level, {}).get(board, [])
+
+    def subject(self, subject_id: int) -> Optional[Subject]:
+        return self.subjects_by_id.get(subject_id)
+
+    def topics(self, subject_id: int) -> list[Topic]:
+        return self.topics_by_subject.get(subject_id, [])
+
+    def topic_hours(self, subject_id: int) -> dict[int, int]:
+        hours = self._topic_hours.get(subject_id)
+        if hours is None:
+            hours = self._topic_hours[subject_id] = {
+                t["id"]: t["hours"] or 0 for t in self.topics(subject_id)
+            }
+        return hours
+
+    def topic_sizes(self, subject_id: int) -> list[str]:
+        sizes = self._topic_sizes.get(subject_id)
+        if sizes is None:
+            sizes = self._topic_sizes[subject_id] = list(
+                dict.fromkeys(t["size"] for t in self.topics(subject_id))
+            )
+        return sizes
+
+
+_EMPTY_CATALOG = CatalogIndex(0, [], [])
+
+
+_catalog: Optional[CatalogIndex] = None
+_next_version_check = 0.0
+_refresh_lock = asyncio.Lock()
+
+
+async def _current_version(session) -> int:
+    result = await session.execute(text(CATALOG_VERSION_SQL))
+    return result.scalar() or 0
+
+
+async def get_catalog() -> CatalogIndex:
+    """Return the shared catalog, reloading it when catalog_version was bumped.
+
+    The version row is checked at most every CATALOG_VERSION_CHECK_INTERVAL
+    seconds, so most calls return without touching the database.
+    """
+    global _catalog, _next_version_check
+    if _catalog is not None and time.monotonic() < _next_version_check:
+        return _catalog
+    async with _refresh_lock:
+        if _catalog is not None and time.monotonic() < _next_version_check:
+            return _catalog
+        async with asession() as session:
+            version = await _current_version(session)
+            if _catalog is None or _catalog.version != version:
+                subjects = await session.execute(
+                    text("SELECT id, level, board, subject, examcode, examdate FROM subjects")
+                )
+                topics = await session.execute(
+                    text("SELECT id, subjectid, topic, size, hours FROM topics")
+                )
+                _catalog = CatalogIndex(
+                    version, subjects.fetchall(), topics.fetchall()
+                )
+        _next_version_check = time.monotonic() + CATALOG_VERSION_CHECK_INTERVAL
+        return _catalog
+
+
+def current_catalog() -> CatalogIndex:
+    """The catalog as last loaded, without checking the version; for computed vars."""
+    return _catalog or _EMPTY_CATALOG
+
+
+def invalidate_catalog() -> None:
+    """Force the next get_catalog() call to re-check the version."""
+    global _next_version_check
+    _next_version_check = 0.0
+
+
+async def warm_catalog():
+    await get_catalog()
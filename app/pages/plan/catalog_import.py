@@ -0,0 +1,273 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_COMMIT_EVERY = 10
+MAX_REPORTED_ERRORS = 20
+
+
+class RowError(ValueError):
+    """Raised for a catalog row that fails validation."""
+
+
+class Field(NamedTuple):
+    name: str
+    parse: Callable[[Any], Any]
+    required: bool = False
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("not an integer")
+    if isinstance(value, str):
+        value = value.strip()
+    return int(value)
+
+
+def _str(max_length: int) -> Callable[[Any], str]:
+    def parse(value: Any) -> str:
+        value = str(value).strip()
+        if len(value) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        return value
+
+    return parse
+
+
+def _hours(value: Any) -> int:
+    hours = _int(value)
+    if hours < 0:
+        raise ValueError("must not be negative")
+    return hours
+
+
+CATALOG_FIELDS: dict[str, list[Field]] = {
+    "subjects": [
+        Field("id", _int, required=True),
+        Field("level", _str(45), required=True),
+        Field("board", _str(45), required=True),
+        Field("subject", _str(45), required=True),
+        Field("examcode", _str(45)),
+        Field("description", _str(45)),
+        Field("examdate", _str(45)),
+    ],
+    "topics": [
+        Field("id", _int, required=True),
+        Field("subjectid", _int, required=True),
+        Field("topic", _str(255), required=True),
+        Field("size", _str(45)),
+        Field("hours", _hours),
+    ],
+}
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield (line number, raw record) pairs from CSV or JSON Lines input."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line_no == 1 and line.startswith("["):
+            raise RowError("JSON input must have one object per line, not an array")
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            record = e
+        yield line_no, record
+
+
+def validate(record: Any, fields: list[Field]) -> dict:
+    if isinstance(record, Exception):
+        raise RowError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise RowError("expected an object")
+    row = {}
+    for field in fields:
+        value = record.get(field.name)
+        if value is None or value == "":
+            if field.required:
+                raise RowError(f"{field.name} is required")
+            row[field.name] = None
+            continue
+        try:
+            row[field.name] = field.parse(value)
+        except (TypeError, ValueError) as e:
+            raise RowError(f"{field.name}: {e}") from None
+    return row
+
+
+class ImportStats:
+    """Counters for one import run."""
+
+    def __init__(self):
+        self.read = 0
+        self.upserted = 0
+        self.rejected = 0
+        self.errors: list[str] = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.upserted / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line_no: int, error: RowError) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_no}: {error}")
+
+
+def valid_rows(
+    records: Iterable[tuple[int, Any]], fields: list[Field], stats: ImportStats
+) -> Iterator[dict]:
+    for line_no, record in records:
+        stats.read += 1
+        try:
+            yield validate(record, fields)
+        except RowError as e:
+            stats.reject(line_no, e)
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def upsert_sql(dialect: str, table: str, columns: list[str]) -> str:
+    names = ", ".join(columns)
+    values = ", ".join(f":{c}" for c in columns)
+    updates = [c for c in columns if c != "id"]
+    if dialect == "mysql":
+        # The VALUES() form keeps the statement in the shape pymysql rewrites
+        # into one multi-row INSERT per executemany call.
+        assignments = ", ".join(f"{c} = VALUES({c})" for c in updates)
+        return f"INSERT INTO {table} ({names}) VALUES ({values}) ON DUPLICATE KEY UPDATE {assignments}"
+    assignments = ", ".join(f"{c} = excluded.{c}" for c in updates)
+    return f"INSERT INTO {table} ({names}) VALUES ({values}) ON CONFLICT (id) DO UPDATE SET {assignments}"
+
+
+def bump_catalog_version(conn: Connection) -> None:
+    """Make every worker reload its cached catalog on the next version check."""
+    conn.execute(text("UPDATE catalog_version SET version = version + 1 WHERE id = 1"))
+
+
+def import_catalog(
+    conn: Connection,
+    table: str,
+    records: Iterable[tuple[int, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    commit_every: int = DEFAULT_COMMIT_EVERY,
+    progress: Optional[Callable[[ImportStats], None]] = None,
+) -> ImportStats:
+    """Upsert validated records into subjects or topics in executemany chunks.
+
+    Records are consumed lazily, so memory use is bounded by chunk_size. The
+    connection is committed every commit_every chunks and once at the end,
+    together with the catalog version bump.
+    """
+    fields = CATALOG_FIELDS[table]
+    sql = text(upsert_sql(conn.dialect.name, table, [f.name for f in fields]))
+    stats = ImportStats()
+    rows = valid_rows(records, fields, stats)
+    for n, chunk in enumerate(chunked(rows, chunk_size), start=1):
+        conn.execute(sql, chunk)
+        stats.upserted += len(chunk)
+        if n % commit_every == 0:
+            conn.commit()
+            if progress:
+                progress(stats)
+    if stats.upserted:
+        bump_catalog_version(conn)
+    conn.commit()
+    return stats
+
+
+def _format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".json", ".jsonl", ".ndjson")):
+        return "jsonl"
+    raise SystemExit(f"Cannot tell the format of {path}; pass --format")
+
+
+def _print_progress(stats: ImportStats) -> None:
+    print(
+        f"{stats.upserted} rows upserted, {stats.rejected} rejected "
+        f"({stats.rows_per_second:.0f} rows/s)",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream a CSV or JSON Lines file into the subjects or topics table."
+    )
+    parser.add_argument("table", choices=sorted(CATALOG_FIELDS))
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument("--db-url", default=os.environ.get("REFLEX_DB_URL"))
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=DEFAULT_COMMIT_EVERY,
+        help="commit after this many chunks",
+    )
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error("pass --db-url or set REFLEX_DB_URL")
+
+    if args.path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        fmt = args.format or "csv"
+    else:
+        stream = open(args.path, encoding="utf-8-sig", newline="")
+        fmt = _format(args.path, args.format)
+    engine = create_engine(args.db_url)
+    try:
+        with stream, engine.connect() as conn:
+            stats = import_catalog(
+                conn,
+                args.table,
+                read_records(stream, fmt),
+                args.chunk_size,
+                args.commit_every,
+                _print_progress,
+            )
+    except RowError as e:
+        raise SystemExit(str(e))
+    finally:
+        engine.dispose()
+    for error in stats.errors:
+        print(error, file=sys.stderr)
+    print(
+        f"Imported {stats.upserted} of {stats.read} {args.table} rows in "
+        f"{stats.elapsed:.1f} s ({stats.rows_per_second:.0f} rows/s), "
+        f"{stats.rejected} rejected"
+    )
+    sys.exit(1 if stats.rejected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,63 @@
 import reflex as rx
+from app.db.queries import (
+    BOOKED_HOURS_SQL,
+    DELETE_PLAN_SQL,
+    MOVABLE_ROWS_SQL,
+    PLAN_PAGE_AFTER_DATED,
+    PLAN_PAGE_AFTER_UNDATED,
+    PLAN_PAGE_SQL,
+    SUBJECT_ROWS_SQL,
+)
+from app.db.session import asession
 from app.pages.auth.auth_backend import AuthState, User
+from app.pages.plan.catalog import (
+    CatalogIndex,
+    Subject,
+    Topic,
+    current_catalog,
+    get_catalog,
+)
+from app.pages.plan.plan_diff import (
+    ExistingRow,
+    PlanDiff,
+    diff_plan,
+    remaining_hours,
+    split_kept_rows,
+)
+from app.pages.plan.scheduler import (
+    DEFAULT_DAILY_HOURS,
+    EdfSchedule,
+    ScheduledBlock,
+    ScheduleError,
+    SubjectTasks,
+    parse_exam_date,
+    plan_subject,
+    plan_subjects,
+)
+from app.pages.plan.state_codec import (
+    CodecVersionError,
+    encode_id_set,
+    encode_plan_items,
+    encode_topics,
+    pack_fields,
+    unpack_fields,
+)
+from app.pages.plan.status_writer import PLAN_STATUSES, status_writer
+from app.pages.plan.topic_search import search_index
+from reflex.utils.exceptions import StateSchemaMismatchError
 from sqlalchemy import text
 from typing import TypedDict, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import os
 import random
 
+PLAN_PAGE_SIZE = int(os.environ.get("PLAN_PAGE_SIZE", "50"))
+# Pages held in study_plan_items at once while the table is scrolled.
+PLAN_WINDOW_PAGES = max(2, int(os.environ.get("PLAN_WINDOW_PAGES", "3")))
+TOPIC_SEARCH_LIMIT = int(os.environ.get("TOPIC_SEARCH_LIMIT", "50"))
 
-class Subject(TypedDict):
-    id: int
-    subject: str
-    examcode: str
-    examdate: str
-
-
-class Topic(TypedDict):
-    id: int
-    topic: str
-    size: str
-    hours: int
+# (study_date, id) of the last row before a page; None for the first page.
+PlanCursor = Optional[tuple[Optional[str], int]]
 
 
 class StudyPlanItem(TypedDict):
@@ -29,29 +69,89 @@ class StudyPlanItem(TypedDict):
     student_topic_id: int
 
 
+_PACKED_FIELDS = {
+    "study_plan_items": encode_plan_items,
+    "visible_topics": encode_topics,
+    "selected_topic_ids": encode_id_set,
+}
+
+
 class PlanState(rx.State):
-    available_levels: list[str] = []
-    available_boards: list[str] = []
-    available_subjects: list[Subject] = []
-    available_topics: list[Topic] = []
+    # The catalog lives in the process-wide CatalogIndex; the state keeps only
+    # the selection and the version its computed views were built from.
+    catalog_version: int = 0
+    # Only the current search window of topics is sent to the client.
+    visible_topics: list[Topic] = []
+    topic_query: str = ""
     selected_level: str = ""
     selected_board: str = ""
     selected_subject_id: int = 0
     selected_exam_date: str = ""
-    selected_topic_ids: list[int] = []
+    # Used as a set: O(1) membership on the server, `.contains` on the client.
+    selected_topic_ids: dict[int, bool] = {}
+    selected_topic_count: int = 0
+    total_study_hours: int = 0
     study_plan_items: list[StudyPlanItem] = []
     loading: bool = False
     generation_in_progress: bool = False
+    plan_error: str = ""
+    plan_first_page: int = 0
+    plan_has_more: bool = False
+    plan_fetching: bool = False
+    _plan_cursors: list[PlanCursor] = [None]
+    # Rows each page of the window contributes to study_plan_items, in order.
+    _plan_window: list[int] = []
 
-    @rx.var
-    def total_study_hours(self) -> int:
-        return sum(
-            (
-                topic["hours"]
-                for topic in self.available_topics
-                if topic["id"] in self.selected_topic_ids
-            )
-        )
+    def __getstate__(self):
+        # The Redis state manager pickles every touched state on each event.
+        return pack_fields(super().__getstate__(), _PACKED_FIELDS)
+
+    def __setstate__(self, state):
+        try:
+            state = unpack_fields(state)
+        except CodecVersionError as e:
+            # Reflex answers a schema mismatch with a fresh state for the token.
+            raise StateSchemaMismatchError(str(e)) from e
+        super().__setstate__(state)
+
+    @rx.var(deps=["catalog_version"], auto_deps=False)
+    def available_levels(self) -> list[str]:
+        return current_catalog().levels
+
+    @rx.var(deps=["catalog_version", "selected_level"], auto_deps=False)
+    def available_boards(self) -> list[str]:
+        return current_catalog().boards(self.selected_level)
+
+    @rx.var(
+        deps=["catalog_version", "selected_level", "selected_board"], auto_deps=False
+    )
+    def available_subjects(self) -> list[Subject]:
+        return current_catalog().subjects(self.selected_level, self.selected_board)
+
+    @rx.var(deps=["catalog_version", "selected_subject_id"], auto_deps=False)
+    def topic_sizes(self) -> list[str]:
+        return current_catalog().topic_sizes(self.selected_subject_id)
+
+    @rx.var(deps=["catalog_version", "selected_subject_id"], auto_deps=False)
+    def topic_count(self) -> int:
+        return len(current_catalog().topics(self.selected_subject_id))
+
+    def _topic_hours(self) -> dict[int, int]:
+        return current_catalog().topic_hours(self.selected_subject_id)
+
+    def _show_topics(self, catalog: CatalogIndex):
+        self.catalog_version = catalog.version
+        self.topic_query = ""
+        self.visible_topics = catalog.topics(self.selected_subject_id)[
+            :TOPIC_SEARCH_LIMIT
+        ]
+        self._set_selection({})
+
+    def _set_selection(self, selected: dict[int, bool]):
+        hours = self._topic_hours()
+        self.selected_topic_ids = selected
+        self.selected_topic_count = len(selected)
+        self.total_study_hours = sum(hours.get(i, 0) for i in selected)
 
     async def _get_current_user(self) -> Optional[User]:
         auth_state = await self.get_state(AuthState)
@@ -69,100 +169,79 @@ class PlanState(rx.State):
 
     @rx.event(background=True)
     async def load_levels(self):
+        catalog = await get_catalog()
         async with self:
-            self.loading = True
-        async with rx.asession() as session:
-            result = await session.execute(
-                text("SELECT DISTINCT level FROM subjects ORDER BY level")
-            )
-            levels = [row[0] for row in result.fetchall()]
-            async with self:
-                self.available_levels = levels
-                self.loading = False
+            self.catalog_version = catalog.version
 
     @rx.event(background=True)
     async def on_level_change(self, level: str):
+        catalog = await get_catalog()
         async with self:
-            self.loading = True
             self.selected_level = level
             self.selected_board = ""
             self.selected_subject_id = 0
-            self.available_boards = []
-            self.available_subjects = []
-            self.available_topics = []
-            self.selected_topic_ids = []
-        async with rx.asession() as session:
-            result = await session.execute(
-                text(
-                    "SELECT DISTINCT board FROM subjects WHERE level = :level ORDER BY board"
-                ),
-                {"level": level},
-            )
-            boards = [row[0] for row in result.fetchall()]
-            async with self:
-                self.available_boards = boards
-                self.loading = False
+            self._show_topics(catalog)
 
     @rx.event(background=True)
     async def on_board_change(self, board: str):
+        catalog = await get_catalog()
         async with self:
-            self.loading = True
             self.selected_board = board
             self.selected_subject_id = 0
-            self.available_subjects = []
-            self.available_topics = []
-            self.selected_topic_ids = []
-        async with rx.asession() as session:
-            result = await session.execute(
-                text(
-                    "SELECT id, subject, examcode, examdate FROM subjects WHERE level = :level AND board = :board ORDER BY subject"
-                ),
-                {"level": self.selected_level, "board": board},
-            )
-            subjects = [
-                Subject(
-                    id=r.id, subject=r.subject, examcode=r.examcode, examdate=r.examdate
-                )
-                for r in result.fetchall()
-            ]
-            async with self:
-                self.available_subjects = subjects
-                self.loading = False
+            self._show_topics(catalog)
 
     @rx.event(background=True)
     async def on_subject_change(self, subject_id_str: str):
         subject_id = int(subject_id_str)
+        catalog = await get_catalog()
         async with self:
-            self.loading = True
             self.selected_subject_id = subject_id
-            self.available_topics = []
-            self.selected_topic_ids = []
-            subject = next(
-                (s for s in self.available_subjects if s["id"] == subject_id), None
-            )
+            subject = catalog.subject(subject_id)
             if subject:
-                self.selected_exam_date = subject["examdate"]
-        async with rx.asession() as session:
-            result = await session.execute(
-                text(
-                    "SELECT id, topic, size, hours FROM topics WHERE subjectid = :subject_id ORDER BY topic"
-                ),
-                {"subject_id": subject_id},
-            )
-            topics = [
-                Topic(id=r.id, topic=r.topic, size=r.size, hours=r.hours)
-                for r in result.fetchall()
-            ]
-            async with self:
-                self.available_topics = topics
-                self.loading = False
+                self.selected_exam_date = subject["examdate"] or ""
+            self._show_topics(catalog)
+        # Warm the search index so the first keystroke does not wait for it.
+        if subject_id:
+            await search_index(catalog, subject_id)
 
     @rx.event
     def toggle_topic(self, topic_id: int):
+        hours = self._topic_hours().get(topic_id)
+        if hours is None:
+            return
         if topic_id in self.selected_topic_ids:
-            self.selected_topic_ids.remove(topic_id)
+            del self.selected_topic_ids[topic_id]
+            self.selected_topic_count -= 1
+            self.total_study_hours -= hours
         else:
-            self.selected_topic_ids.append(topic_id)
+            self.selected_topic_ids[topic_id] = True
+            self.selected_topic_count += 1
+            self.total_study_hours += hours
+
+    @rx.event
+    async def search_topics(self, query: str):
+        self.topic_query = query
+        if not self.selected_subject_id:
+            return
+        catalog = await get_catalog()
+        index = await search_index(catalog, self.selected_subject_id)
+        self.visible_topics = index.search(query, TOPIC_SEARCH_LIMIT)
+
+    @rx.event
+    def select_all_topics(self):
+        self._set_selection(dict.fromkeys(self._topic_hours(), True))
+
+    @rx.event
+    def select_topics_by_size(self, size: str):
+        selected = dict(self.selected_topic_ids)
+        for topic in current_catalog().topics(self.selected_subject_id):
+            if topic["size"] == size:
+                selected[topic["id"]] = True
+        self._set_selection(selected)
+
+    @rx.event
+    def clear_topic_selection(self):
+        self._set_selection({})
 
     @rx.event(background=True)
     async def generate_plan(self):
@@ -171,42 +250,91 @@ class PlanState(rx.State):
             return
         async with self:
             self.generation_in_progress = True
-        await self.delete_plan(clear_ui=False)
+            self.plan_error = ""
+        catalog = await get_catalog()
         selected_topics = [
-            t for t in self.available_topics if t["id"] in self.selected_topic_ids
+            t
+            for t in catalog.topics(self.selected_subject_id)
+            if t["id"] in self.selected_topic_ids
         ]
-        subject_details = next(
-            (s for s in self.available_subjects if s["id"] == self.selected_subject_id),
-            None,
-        )
+        subject_details = catalog.subject(self.selected_subject_id)
         if not subject_details:
             async with self:
                 self.generation_in_progress = False
             return
-        plan = []
-        for topic in selected_topics:
-            plan.append(
-                {
-                    "student_id": user.id,
-                    "level": self.selected_level,
-                    "subject": topic["topic"],
-                    "examboard": self.selected_board,
-                    "examcode": subject_details["examcode"],
-                    "examdate": self.selected_exam_date,
-                }
+        today = date.today()
+        subject_key = {"user_id": user.id, "subject_id": self.selected_subject_id}
+        # Past and started rows stay as they are; only what is left is planned.
+        await status_writer.flush(user.id)
+        async with asession() as session:
+            kept, _ = split_kept_rows(await _subject_rows(session, subject_key), today)
+        topics = remaining_hours(
+            [(t["id"], t["hours"] or 0) for t in selected_topics], kept
+        )
+        moved: dict[int, list[ScheduledBlock]] = {}
+        movable: list = []
+        try:
+            exam_date = parse_exam_date(self.selected_exam_date)
+            booked = await _booked_hours(subject_key, today)
+            for row in kept:
+                if row.study_date is not None and row.study_date >= today:
+                    booked[row.study_date] = booked.get(row.study_date, 0) + (
+                        row.hours or 0
+                    )
+            schedule = plan_subject(
+                topics, start=today, exam_date=exam_date, booked=booked
             )
-        async with rx.asession() as session:
-            if plan:
-                await session.execute(
-                    text(
-                        "INSERT INTO student_topics (student_id, level, subject, examboard, examcode, examdate) VALUES (:student_id, :level, :subject, :examboard, :examcode, :examdate)"
-                    ),
-                    plan,
+            if schedule.missed:
+                # Subjects with later exams can give up their unstarted days.
+                movable = await _movable_rows(subject_key, exam_date, today)
+                if movable:
+                    schedule, moved = _replan_later_subjects(
+                        self.selected_subject_id,
+                        exam_date,
+                        topics,
+                        movable,
+                        booked,
+                        today,
+                    )
+        except ScheduleError as e:
+            async with self:
+                self.plan_error = str(e)
+                self.generation_in_progress = False
+            return
+        if schedule.missed:
+            async with self:
+                self.plan_error = _missed_message(schedule.missed, booked)
+                self.generation_in_progress = False
+            return
+        topic_names = {t["id"]: t["topic"] for t in selected_topics}
+        row_template = {
+            "student_id": user.id,
+            "subject_id": self.selected_subject_id,
+            "level": self.selected_level,
+            "examboard": self.selected_board,
+            "examcode": subject_details["examcode"],
+            "examdate": self.selected_exam_date,
+        }
+        async with asession() as session:
+            async with session.begin():
+                _, open_rows = split_kept_rows(
+                    await _subject_rows(session, subject_key), today
                 )
-                await session.commit()
+                diff = diff_plan(open_rows, schedule.blocks, self.selected_exam_date)
+                await _apply_plan_diff(session, diff, row_template, topic_names)
+                for subject_id, blocks in moved.items():
+                    await _move_subject_rows(
+                        session,
+                        user.id,
+                        subject_id,
+                        blocks,
+                        [r for r in movable if r.subject_id == subject_id],
+                    )
         async with self:
             self.generation_in_progress = False
-        yield PlanState.load_plan()
+        if moved or not diff.is_empty:
+            await status_writer.flush(user.id)
+            await self._show_plan_page(user.id, self.plan_first_page)
 
     @rx.event(background=True)
     async def load_plan(self):
@@ -215,37 +343,88 @@ class PlanState(rx.State):
             return
         async with self:
             self.loading = True
-        async with rx.asession() as session:
-            result = await session.execute(
-                text("""SELECT id, examdate, subject FROM student_topics
-                       WHERE student_id = :user_id ORDER BY examdate, subject"""),
-                {"user_id": user.id},
-            )
-            rows = result.fetchall()
-        all_topics_result = await session.execute(
-            text("SELECT topic, hours FROM topics")
-        )
-        topic_details_map = {r.topic: r.hours for r in all_topics_result.fetchall()}
-        items = [
-            StudyPlanItem(
-                id=r.id,
-                date=r.examdate,
-                subject=r.subject,
-                hours=topic_details_map.get(r.subject, 0),
-                status="Not Started",
-                student_topic_id=r.id,
-            )
-            for r in rows
-        ]
+        await status_writer.flush(user.id)
+        await self._show_plan_page(user.id, 0)
+
+    @rx.event(background=True)
+    async def plan_scrolled(self, edge: str):
+        """Load the page beyond the edge ("start" or "end") the table was scrolled to."""
+        user = await self._get_current_user()
+        if not user:
+            return
+        async with self:
+            if self.plan_fetching:
+                return
+            if edge == "end" and self.plan_has_more:
+                page = self.plan_first_page + len(self._plan_window)
+            elif edge == "start" and self.plan_first_page > 0:
+                page = self.plan_first_page - 1
+            else:
+                return
+            self.plan_fetching = True
+            cursor = self._plan_cursors[page]
+        try:
+            async with asession() as session:
+                items, next_cursor = await _fetch_plan_page(session, user.id, cursor)
+        except Exception:
+            async with self:
+                self.plan_fetching = False
+            raise
+        async with self:
+            self.plan_fetching = False
+            # A reload in the meantime moved the window; the page no longer borders it.
+            if page == self.plan_first_page + len(self._plan_window):
+                self._append_plan_page(page, items, next_cursor)
+            elif page == self.plan_first_page - 1:
+                self._prepend_plan_page(page, items)
+
+    def _append_plan_page(self, page: int, items: list, next_cursor: PlanCursor):
+        del self._plan_cursors[page + 1 :]
+        if next_cursor is not None:
+            self._plan_cursors.append(next_cursor)
+        self.plan_has_more = next_cursor is not None
+        self._plan_window.append(len(items))
+        rows = self.study_plan_items + items
+        if len(self._plan_window) > PLAN_WINDOW_PAGES:
+            rows = rows[self._plan_window.pop(0) :]
+            self.plan_first_page += 1
+        self.study_plan_items = rows
+
+    def _prepend_plan_page(self, page: int, items: list):
+        self._plan_window.insert(0, len(items))
+        self.plan_first_page = page
+        rows = items + self.study_plan_items
+        if len(self._plan_window) > PLAN_WINDOW_PAGES:
+            rows = rows[: len(rows) - self._plan_window.pop()]
+            self.plan_has_more = True
+        self.study_plan_items = rows
+
+    async def _show_plan_page(self, user_id: int, page: int):
+        """Reset the window to one keyset page of the plan."""
+        async with self:
+            page = min(page, len(self._plan_cursors) - 1)
+            cursor = self._plan_cursors[page]
+        async with asession() as session:
+            items, next_cursor = await _fetch_plan_page(session, user_id, cursor)
         async with self:
+            del self._plan_cursors[page + 1 :]
+            if next_cursor is not None:
+                self._plan_cursors.append(next_cursor)
+            self.plan_first_page = page
+            self.plan_has_more = next_cursor is not None
+            self._plan_window = [len(items)]
             self.study_plan_items = items
             self.loading = False
 
     @rx.event
-    def update_plan_item_status(self, item_id: int, new_status: str):
+    async def update_plan_item_status(self, item_id: int, new_status: str):
+        user = await self._get_current_user()
+        if not user or new_status not in PLAN_STATUSES:
+            return
         for i, item in enumerate(self.study_plan_items):
             if item["id"] == item_id:
                 self.study_plan_items[i]["status"] = new_status
+                status_writer.record(user.id, item_id, new_status)
                 break
 
     @rx.event(background=True)
@@ -253,12 +432,205 @@ class PlanState(rx.State):
         user = await self._get_current_user()
         if not user:
             return
-        async with rx.asession() as session:
-            await session.execute(
-                text("DELETE FROM student_topics WHERE student_id = :user_id"),
-                {"user_id": user.id},
-            )
+        async with asession() as session:
+            await session.execute(text(DELETE_PLAN_SQL), {"user_id": user.id})
             await session.commit()
         if clear_ui:
             async with self:
-                self.study_plan_items = []
\ No newline at end of file
+                self.study_plan_items = []
+                self.plan_first_page = 0
+                self.plan_has_more = False
+                self._plan_cursors = [None]
+                self._plan_window = []
+
+
+async def _booked_hours(subject_key: dict, start: date) -> dict[date, int]:
+    """Hours per day already planned for the student's other subjects."""
+    async with asession() as session:
+        result = await session.execute(
+            text(BOOKED_HOURS_SQL), {**subject_key, "start": start}
+        )
+        return {
+            date.fromisoformat(str(r.study_date)): int(r.hours or 0)
+            for r in result.fetchall()
+        }
+
+
+async def _movable_rows(subject_key: dict, exam_date: date, start: date) -> list:
+    """Unstarted future rows of the student's subjects whose exam is after exam_date."""
+    async with asession() as session:
+        result = await session.execute(
+            text(MOVABLE_ROWS_SQL), {**subject_key, "start": start}
+        )
+        rows = result.fetchall()
+    movable = []
+    for r in rows:
+        try:
+            later = parse_exam_date(r.examdate) > exam_date
+        except ScheduleError:
+            later = False
+        if later:
+            movable.append(r)
+    return movable
+
+
+def _replan_later_subjects(
+    subject_id: int,
+    exam_date: date,
+    topics: list[tuple[int, int]],
+    movable: list,
+    booked: dict[date, int],
+    start: date,
+) -> tuple[EdfSchedule, dict[int, list[ScheduledBlock]]]:
+    """Plan the subject together with the movable rows of later exams, EDF."""
+    fixed = dict(booked)
+    later: dict[int, dict[int, int]] = {}
+    exams: dict[int, date] = {}
+    for r in movable:
+        day = date.fromisoformat(str(r.study_date))
+        fixed[day] = fixed.get(day, 0) - (r.hours or 0)
+        hours = later.setdefault(r.subject_id, {})
+        hours[r.topic_id] = hours.get(r.topic_id, 0) + (r.hours or 0)
+        exams[r.subject_id] = parse_exam_date(r.examdate)
+    combined = plan_subjects(
+        [
+            SubjectTasks(subject_id, exam_date, topics),
+            *(
+                SubjectTasks(later_id, exams[later_id], list(hours.items()))
+                for later_id, hours in later.items()
+            ),
+        ],
+        start=start,
+        booked=fixed,
+    )
+    blocks = dict(combined.blocks)
+    return EdfSchedule(blocks.pop(subject_id), combined.missed), blocks
+
+
+async def _move_subject_rows(
+    session, user_id: int, subject_id: int, blocks: list[ScheduledBlock], rows: list
+) -> None:
+    first = rows[0]
+    existing = [
+        ExistingRow(
+            id=r.id,
+            topic_id=r.topic_id,
+            study_date=date.fromisoformat(str(r.study_date)),
+            hours=r.hours,
+            examdate=r.examdate,
+        )
+        for r in rows
+    ]
+    row_template = {
+        "student_id": user_id,
+        "subject_id": subject_id,
+        "level": first.level,
+        "examboard": first.examboard,
+        "examcode": first.examcode,
+        "examdate": first.examdate,
+    }
+    topic_names = {r.topic_id: r.subject for r in rows}
+    diff = diff_plan(existing, blocks, first.examdate)
+    await _apply_plan_diff(session, diff, row_template, topic_names)
+
+
+def _missed_message(missed: dict[date, int], booked: dict[date, int]) -> str:
+    shortfall = sum(missed.values())
+    full_days = sum(1 for hours in booked.values() if hours >= DEFAULT_DAILY_HOURS)
+    message = (
+        f"{shortfall} hours do not fit before the exam at "
+        f"{DEFAULT_DAILY_HOURS} hours per day."
+    )
+    if full_days:
+        message += f" {full_days} days are already full with other subjects."
+    return message
+
+
+async def _fetch_plan_page(
+    session, user_id: int, cursor: PlanCursor
+) -> tuple[list[StudyPlanItem], PlanCursor]:
+    """One page of the plan after cursor, plus the cursor of the page after it."""
+    params = {"user_id": user_id, "limit": PLAN_PAGE_SIZE + 1}
+    after = ""
+    if cursor is not None:
+        after_date, params["after_id"] = cursor
+        if after_date is None:
+            after = PLAN_PAGE_AFTER_UNDATED
+        else:
+            after = PLAN_PAGE_AFTER_DATED
+            params["after_date"] = after_date
+    result = await session.execute(text(PLAN_PAGE_SQL.format(after=after)), params)
+    rows = result.fetchall()
+    next_cursor = None
+    if len(rows) > PLAN_PAGE_SIZE:
+        rows = rows[:PLAN_PAGE_SIZE]
+        last = rows[-1]
+        next_cursor = (str(last.study_date) if last.study_date else None, last.id)
+    items = [
+        StudyPlanItem(
+            id=r.id,
+            date=str(r.date),
+            subject=r.subject,
+            hours=r.hours,
+            status=r.status,
+            student_topic_id=r.id,
+        )
+        for r in rows
+    ]
+    return items, next_cursor
+
+
+async def _subject_rows(session, subject_key: dict) -> list[ExistingRow]:
+    result = await session.execute(text(SUBJECT_ROWS_SQL), subject_key)
+    return [
+        ExistingRow(
+            id=r.id,
+            topic_id=r.topic_id,
+            study_date=date.fromisoformat(str(r.study_date)) if r.study_date else None,
+            hours=r.hours,
+            examdate=r.examdate,
+            status=r.status,
+        )
+        for r in result.fetchall()
+    ]
+
+
+async def _apply_plan_diff(
+    session, diff: PlanDiff, row_template: dict, topic_names: dict[int, str]
+) -> None:
+    if diff.deletes:
+        await session.execute(
+            text("DELETE FROM student_topics WHERE id = :id"),
+            [{"id": row_id} for row_id in diff.deletes],
+        )
+    if diff.updates:
+        await session.execute(
+            text(
+                "UPDATE student_topics SET study_date = :study_date, hours = :hours, examdate = :examdate WHERE id = :id"
+            ),
+            [
+                {
+                    "id": row_id,
+                    "study_date": block.day,
+                    "hours": block.hours,
+                    "examdate": row_template["examdate"],
+                }
+                for row_id, block in diff.updates
+            ],
+        )
+    if diff.inserts:
+        await session.execute(
+            text(
+                "INSERT INTO student_topics (student_id, subject_id, topic_id, level, subject, examboard, examcode, examdate, study_date, hours) VALUES (:student_id, :subject_id, :topic_id, :level, :subject, :examboard, :examcode, :examdate, :study_date, :hours)"
+            ),
+            [
+                {
+                    **row_template,
+                    "topic_id": block.topic_id,
+                    "subject": topic_names[block.topic_id],
+                    "study_date": block.day,
+                    "hours": block.hours,
+                }
+                for block in diff.inserts
+            ],
+        )
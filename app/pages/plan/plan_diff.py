@@ -0,0 +1,112 @@
+from datetime import date
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from app.pages.plan.scheduler import ScheduledBlock
+
+
+class ExistingRow(NamedTuple):
+    id: int
+    topic_id: Optional[int]
+    study_date: Optional[date]
+    hours: Optional[int]
+    examdate: Optional[str]
+    status: str = "Not Started"
+
+
+class PlanDiff(NamedTuple):
+    inserts: list[ScheduledBlock]
+    # (row id, block) pairs whose date, hours or exam date changed.
+    updates: list[tuple[int, ScheduledBlock]]
+    deletes: list[int]
+    unchanged: list[int]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.inserts or self.updates or self.deletes)
+
+
+def split_kept_rows(
+    existing: Iterable[ExistingRow], today: date
+) -> tuple[list[ExistingRow], list[ExistingRow]]:
+    """Split rows into (kept, open).
+
+    Rows dated before today or already started are history: regenerating
+    never touches them. Only open rows are rescheduled.
+    """
+    kept: list[ExistingRow] = []
+    open_rows: list[ExistingRow] = []
+    for row in existing:
+        past = row.study_date is not None and row.study_date < today
+        if past or row.status != "Not Started":
+            kept.append(row)
+        else:
+            open_rows.append(row)
+    return kept, open_rows
+
+
+def remaining_hours(
+    topics: Iterable[tuple[int, int]], kept: Iterable[ExistingRow]
+) -> list[tuple[int, int]]:
+    """(topic_id, hours) still to schedule once the kept rows are counted."""
+    done: dict[Optional[int], int] = {}
+    for row in kept:
+        done[row.topic_id] = done.get(row.topic_id, 0) + (row.hours or 0)
+    left = [(topic_id, hours - done.get(topic_id, 0)) for topic_id, hours in topics]
+    return [(topic_id, hours) for topic_id, hours in left if hours > 0]
+
+
+def diff_plan(
+    existing: Iterable[ExistingRow], desired: Sequence[ScheduledBlock], examdate: str
+) -> PlanDiff:
+    """Match open rows to desired blocks per topic.
+
+    Rows already on a block's (topic_id, study_date) are matched first; the
+    topic's other rows then take its remaining blocks in date order and are
+    moved in place. Matched rows keep their id (and anything stored against
+    it); only rows left over are deleted and only blocks left over inserted.
+    """
+    rows_by_topic: dict[Optional[int], list[ExistingRow]] = {}
+    for row in existing:
+        rows_by_topic.setdefault(row.topic_id, []).append(row)
+    blocks_by_topic: dict[int, list[ScheduledBlock]] = {}
+    for block in desired:
+        blocks_by_topic.setdefault(block.topic_id, []).append(block)
+
+    inserts: list[ScheduledBlock] = []
+    updates: list[tuple[int, ScheduledBlock]] = []
+    deletes: list[int] = []
+    unchanged: list[int] = []
+    for topic_id, blocks in blocks_by_topic.items():
+        rows = rows_by_topic.pop(topic_id, [])
+        on_day = {}
+        for row in rows:
+            if row.study_date is not None:
+                on_day.setdefault(row.study_date, row)
+        pairs: list[tuple[ExistingRow, ScheduledBlock]] = []
+        unplaced: list[ScheduledBlock] = []
+        for block in blocks:
+            row = on_day.pop(block.day, None)
+            if row is None:
+                unplaced.append(block)
+            else:
+                pairs.append((row, block))
+        matched = {row.id for row, _ in pairs}
+        spare = sorted(
+            (row for row in rows if row.id not in matched),
+            key=lambda row: (row.study_date or date.max, row.id),
+        )
+        pairs.extend(zip(spare, unplaced))
+        inserts.extend(unplaced[len(spare) :])
+        deletes.extend(row.id for row in spare[len(unplaced) :])
+        for row, block in pairs:
+            if (
+                row.study_date != block.day
+                or row.hours != block.hours
+                or row.examdate != examdate
+            ):
+                updates.append((row.id, block))
+            else:
+                unchanged.append(row.id)
+    for rows in rows_by_topic.values():
+        deletes.extend(row.id for row in rows)
+    return PlanDiff(inserts, updates, deletes, unchanged)
@@ -4,6 +4,15 @@ from app.components.shared.footer import footer
 from app.pages.auth.auth_backend import AuthState
 from app.pages.plan.plan_backend import PlanState, Topic, StudyPlanItem
 
+PLAN_SCROLL_ID = "plan-scroll"
+# Which edge of the plan table a scroll ended near: "start", "end" or "".
+_PLAN_SCROLL_EDGE_JS = f"""(() => {{
+    const el = document.getElementById("{PLAN_SCROLL_ID}");
+    if (!el) return "";
+    if (el.scrollHeight - el.scrollTop - el.clientHeight < 200) return "end";
+    return el.scrollTop < 200 ? "start" : "";
+}})()"""
+
 
 def _form_select(
     label: str,
@@ -48,6 +57,36 @@ def _subject_select(
     )
 
 
+def _topic_bulk_actions() -> rx.Component:
+    link_class = "text-sm text-emerald-600 hover:text-emerald-700"
+    return rx.el.div(
+        rx.el.button(
+            "Select all", on_click=PlanState.select_all_topics, class_name=link_class
+        ),
+        rx.el.button(
+            "Clear", on_click=PlanState.clear_topic_selection, class_name=link_class
+        ),
+        rx.el.select(
+            rx.el.option("Select by size", value="", disabled=True),
+            rx.foreach(
+                PlanState.topic_sizes,
+                lambda size: rx.el.option(size, value=size),
+            ),
+            value="",
+            on_change=PlanState.select_topics_by_size,
+            class_name="text-sm px-2 py-1 border border-gray-300 rounded-md",
+        ),
+        rx.el.span(
+            PlanState.selected_topic_count,
+            " of ",
+            PlanState.topic_count,
+            " selected",
+            class_name="ml-auto text-sm text-gray-500",
+        ),
+        class_name="flex items-center gap-4",
+    )
+
+
 def _topic_checkbox(topic: Topic) -> rx.Component:
     return rx.el.label(
         rx.el.div(
@@ -152,8 +191,21 @@ def _authenticated_view() -> rx.Component:
                 rx.cond(
                     PlanState.selected_subject_id > 0,
                     rx.el.div(
-                        rx.foreach(PlanState.available_topics, _topic_checkbox),
-                        class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-2 border rounded-lg p-2 max-h-72 overflow-y-auto",
+                        _topic_bulk_actions(),
+                        rx.debounce_input(
+                            rx.el.input(
+                                placeholder="Search topics",
+                                value=PlanState.topic_query,
+                                on_change=PlanState.search_topics,
+                                class_name="w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-emerald-500 focus:border-emerald-500",
+                            ),
+                            debounce_timeout=150,
+                        ),
+                        rx.el.div(
+                            rx.foreach(PlanState.visible_topics, _topic_checkbox),
+                            class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-2 border rounded-lg p-2 max-h-72 overflow-y-auto",
+                        ),
+                        class_name="space-y-2",
                     ),
                     rx.el.p(
                         "Select a subject to see available topics.",
@@ -171,12 +223,19 @@ def _authenticated_view() -> rx.Component:
                         f"Exam Date: {PlanState.selected_exam_date}",
                         class_name="text-sm text-gray-600",
                     ),
+                    rx.cond(
+                        PlanState.plan_error != "",
+                        rx.el.p(
+                            PlanState.plan_error, class_name="text-sm text-red-600"
+                        ),
+                        None,
+                    ),
                 ),
                 rx.el.button(
                     "Generate Study Plan",
                     on_click=PlanState.generate_plan,
                     is_loading=PlanState.generation_in_progress,
-                    disabled=(PlanState.selected_topic_ids.length() == 0)
+                    disabled=(PlanState.selected_topic_count == 0)
                     | PlanState.generation_in_progress,
                     class_name="px-6 py-2 bg-emerald-500 text-white font-semibold rounded-lg shadow-md hover:bg-emerald-600 disabled:bg-gray-300 transition-all",
                 ),
@@ -225,7 +284,7 @@ def _authenticated_view() -> rx.Component:
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                                 ),
                             ),
-                            class_name="bg-gray-50",
+                            class_name="bg-gray-50 sticky top-0",
                         ),
                         rx.el.tbody(
                             rx.foreach(PlanState.study_plan_items, _plan_table_row),
@@ -233,7 +292,12 @@ def _authenticated_view() -> rx.Component:
                         ),
                         class_name="min-w-full divide-y divide-gray-200",
                     ),
-                    class_name="shadow-sm overflow-hidden border-b border-gray-200 sm:rounded-lg",
+                    _plan_window_footer(),
+                    id=PLAN_SCROLL_ID,
+                    on_scroll_end=rx.call_script(
+                        _PLAN_SCROLL_EDGE_JS, callback=PlanState.plan_scrolled
+                    ),
+                    class_name="shadow-sm max-h-[70vh] overflow-y-auto border-b border-gray-200 sm:rounded-lg",
                 ),
                 rx.el.div(
                     rx.el.p(
@@ -248,6 +312,23 @@ def _authenticated_view() -> rx.Component:
     )
 
 
+def _plan_window_footer() -> rx.Component:
+    # Fallback for keyboards and browsers without scrollend.
+    return rx.el.div(
+        rx.cond(
+            PlanState.plan_has_more,
+            rx.el.button(
+                "Load more",
+                on_click=lambda: PlanState.plan_scrolled("end"),
+                disabled=PlanState.plan_fetching,
+                class_name="px-3 py-1.5 text-sm text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50",
+            ),
+            rx.el.span("End of plan", class_name="text-sm text-gray-500"),
+        ),
+        class_name="flex justify-center items-center px-6 py-3 bg-gray-50",
+    )
+
+
 def _unauthenticated_view() -> rx.Component:
     return rx.el.div(
         rx.el.p(
@@ -0,0 +1,165 @@
+import heapq
+import os
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Callable, Mapping, NamedTuple, Optional, Sequence
+
+DEFAULT_DAILY_HOURS = int(os.environ.get("PLAN_DAILY_HOURS", "4"))
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+
+
+class ScheduleError(ValueError):
+    """Raised when the selected topics cannot be scheduled before the exam."""
+
+
+class ScheduledBlock(NamedTuple):
+    day: date
+    topic_id: int
+    hours: int
+
+
+def parse_exam_date(value: Optional[str]) -> date:
+    if not value or not value.strip():
+        # subjects.examdate is nullable; the catalog importer can leave it empty.
+        raise ScheduleError("This subject has no exam date.")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ScheduleError(f"Unrecognised exam date: {value!r}")
+
+
+def daily_quotas(total_hours: int, days: int, daily_cap: int) -> array:
+    """Spread total_hours as evenly as possible over days, at most daily_cap each."""
+    if total_hours > days * daily_cap:
+        raise ScheduleError(
+            f"{total_hours} hours do not fit in {days} days at {daily_cap} hours per day."
+        )
+    # Day d ends at floor((d + 1) * total / days) hours, so the rounding is
+    # spread over the whole range instead of piling up on the first days.
+    ends = array("l", ((d + 1) * total_hours // days for d in range(days)))
+    quotas = array("l", ends)
+    for d in range(days - 1, 0, -1):
+        quotas[d] -= ends[d - 1]
+    return quotas
+
+
+class StudyTask(NamedTuple):
+    topic_id: int
+    hours: int
+    deadline: date
+
+
+class EdfSchedule(NamedTuple):
+    blocks: list[ScheduledBlock]
+    # Exam date -> hours that could not be placed before it.
+    missed: dict[date, int]
+
+
+def schedule_edf(
+    tasks: Sequence[StudyTask], start: date, capacity: Callable[[date], int]
+) -> EdfSchedule:
+    """Earliest-deadline-first placement of tasks into per-day capacity.
+
+    Each day the task with the nearest deadline is worked on first; ties keep
+    their input order. A task must finish on the day before its deadline, and
+    whatever is left when the deadline arrives is reported in missed. Runs in
+    O(n log n + days).
+    """
+    heap = [(t.deadline, i, t.topic_id, max(t.hours, 0)) for i, t in enumerate(tasks)]
+    heapq.heapify(heap)
+    blocks: list[ScheduledBlock] = []
+    missed: dict[date, int] = {}
+    day = start
+    while heap:
+        while heap and heap[0][0] <= day:
+            deadline, _, _, remaining = heapq.heappop(heap)
+            missed[deadline] = missed.get(deadline, 0) + remaining
+        free = capacity(day) if heap else 0
+        while heap and (free > 0 or heap[0][3] == 0):
+            deadline, order, topic_id, remaining = heap[0]
+            take = min(free, remaining)
+            blocks.append(ScheduledBlock(day, topic_id, take))
+            free -= take
+            if take == remaining:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (deadline, order, topic_id, remaining - take))
+        day += timedelta(days=1)
+    return EdfSchedule(blocks, {d: h for d, h in missed.items() if h})
+
+
+def plan_subject(
+    topics: Sequence[tuple[int, int]],
+    start: date,
+    exam_date: date,
+    daily_cap: int = DEFAULT_DAILY_HOURS,
+    booked: Optional[Mapping[date, int]] = None,
+) -> EdfSchedule:
+    """Schedule one subject's (topic_id, hours) pairs around hours already booked.
+
+    Hours are paced evenly over the days left before the exam; if other subjects
+    have taken too much of that room, the pacing is dropped and the topics fill
+    whatever capacity remains, earliest day first.
+    """
+    days = (exam_date - start).days
+    if days <= 0:
+        raise ScheduleError("The exam date must be after today.")
+    booked = booked or {}
+    tasks = [StudyTask(topic_id, hours, exam_date) for topic_id, hours in topics]
+
+    def free(day: date) -> int:
+        return max(daily_cap - booked.get(day, 0), 0)
+
+    total = sum(max(hours, 0) for _, hours in topics)
+    try:
+        quotas = daily_quotas(total, days, daily_cap)
+    except ScheduleError:
+        return schedule_edf(tasks, start, free)
+    paced = schedule_edf(
+        tasks, start, lambda day: min(free(day), quotas[(day - start).days])
+    )
+    if not paced.missed:
+        return paced
+    return schedule_edf(tasks, start, free)
+
+
+class SubjectTasks(NamedTuple):
+    subject_id: int
+    exam_date: date
+    # (topic_id, hours) pairs; topic ids are unique across subjects.
+    topics: Sequence[tuple[int, int]]
+
+
+class MultiSchedule(NamedTuple):
+    blocks: dict[int, list[ScheduledBlock]]
+    missed: dict[date, int]
+
+
+def plan_subjects(
+    subjects: Sequence[SubjectTasks],
+    start: date,
+    daily_cap: int = DEFAULT_DAILY_HOURS,
+    booked: Optional[Mapping[date, int]] = None,
+) -> MultiSchedule:
+    """Earliest-deadline-first over several subjects, each due by its own exam.
+
+    Used when one subject no longer fits around the others: subjects with
+    later exams give up their days and move towards their own deadlines.
+    """
+    booked = booked or {}
+    owner: dict[int, int] = {}
+    tasks = []
+    for subject in subjects:
+        for topic_id, hours in subject.topics:
+            owner[topic_id] = subject.subject_id
+            tasks.append(StudyTask(topic_id, hours, subject.exam_date))
+    schedule = schedule_edf(
+        tasks, start, lambda day: max(daily_cap - booked.get(day, 0), 0)
+    )
+    blocks: dict[int, list[ScheduledBlock]] = {s.subject_id: [] for s in subjects}
+    for block in schedule.blocks:
+        blocks[owner[block.topic_id]].append(block)
+    return MultiSchedule(blocks, schedule.missed)
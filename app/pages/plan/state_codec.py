@@ -0,0 +1,197 @@
+import sys
+from array import array
+from operator import itemgetter
+from typing import Any, NamedTuple, Optional, Union
+
+# Bump when a column layout changes; states packed by another version are
+# discarded on load and rebuilt, like any other state schema mismatch.
+CODEC_VERSION = 1
+
+
+class Packed(NamedTuple):
+    """Columnar form of one list field inside a pickled state."""
+
+    kind: str
+    version: int
+    columns: tuple
+
+
+class CodecVersionError(ValueError):
+    pass
+
+
+# An int column is (typecode, raw bytes) in the narrowest fitting array type.
+# Raw bytes pickle several times faster than array objects; every node in a
+# deployment shares one byte order, so the column is read back as written.
+# A column holding anything but ints (e.g. NULL topic hours) is kept as a
+# plain tuple under the empty typecode.
+IntColumn = tuple[str, Union[bytes, tuple]]
+PLAIN = ""
+
+
+def _pack_ints(values: list[Optional[int]]) -> IntColumn:
+    # Each attempt stops at the first value that does not fit.
+    try:
+        try:
+            return "B", bytes(values)
+        except ValueError:
+            pass
+        for typecode in "HI":
+            try:
+                return typecode, array(typecode, values).tobytes()
+            except OverflowError:
+                pass
+        return "q", array("q", values).tobytes()
+    except (TypeError, OverflowError):
+        return PLAIN, tuple(values)
+
+
+def _unpack_ints(column: IntColumn) -> Union[array, tuple]:
+    typecode, data = column
+    return data if typecode == PLAIN else array(typecode, data)
+
+
+def _dictionary(
+    values: list[Optional[str]],
+) -> tuple[tuple[Optional[str], ...], IntColumn]:
+    """Distinct values in first-seen order and each value's index into them."""
+    table = tuple(dict.fromkeys(values))
+    index = {value: code for code, value in enumerate(table)}
+    return table, _pack_ints(list(map(index.__getitem__, values)))
+
+
+def _column(rows: list[dict], key: str) -> list:
+    return list(map(itemgetter(key), rows))
+
+
+def _interned(table: tuple[Optional[str], ...]) -> list[Optional[str]]:
+    # Shares repeated dates and statuses across every loaded session.
+    return [sys.intern(value) if type(value) is str else value for value in table]
+
+
+def encode_plan_items(items: list[dict]) -> Packed:
+    ids = _column(items, "id")
+    topic_ids = _column(items, "student_topic_id")
+    dates, date_codes = _dictionary(_column(items, "date"))
+    subjects, subject_codes = _dictionary(_column(items, "subject"))
+    statuses, status_codes = _dictionary(_column(items, "status"))
+    return Packed(
+        "plan_items",
+        CODEC_VERSION,
+        (
+            _pack_ints(ids),
+            # Rows loaded by the plan page use the student topic id as item id.
+            None if topic_ids == ids else _pack_ints(topic_ids),
+            dates,
+            date_codes,
+            subjects,
+            subject_codes,
+            _pack_ints(_column(items, "hours")),
+            statuses,
+            status_codes,
+        ),
+    )
+
+
+def decode_plan_items(packed: Packed) -> list[dict]:
+    (
+        ids,
+        topic_ids,
+        dates,
+        date_codes,
+        subjects,
+        subject_codes,
+        hours,
+        statuses,
+        status_codes,
+    ) = packed.columns
+    dates, subjects, statuses = map(_interned, (dates, subjects, statuses))
+    ids = _unpack_ints(ids)
+    return [
+        {
+            "id": item_id,
+            "date": dates[date_code],
+            "subject": subjects[subject_code],
+            "hours": item_hours,
+            "status": statuses[status_code],
+            "student_topic_id": topic_id,
+        }
+        for item_id, topic_id, date_code, subject_code, item_hours, status_code in zip(
+            ids,
+            ids if topic_ids is None else _unpack_ints(topic_ids),
+            _unpack_ints(date_codes),
+            _unpack_ints(subject_codes),
+            _unpack_ints(hours),
+            _unpack_ints(status_codes),
+        )
+    ]
+
+
+def encode_topics(topics: list[dict]) -> Packed:
+    sizes, size_codes = _dictionary(_column(topics, "size"))
+    return Packed(
+        "topics",
+        CODEC_VERSION,
+        (
+            _pack_ints(_column(topics, "id")),
+            tuple(_column(topics, "topic")),
+            sizes,
+            size_codes,
+            _pack_ints(_column(topics, "hours")),
+        ),
+    )
+
+
+def decode_topics(packed: Packed) -> list[dict]:
+    ids, names, sizes, size_codes, hours = packed.columns
+    sizes = _interned(sizes)
+    return [
+        {"id": topic_id, "topic": name, "size": sizes[size_code], "hours": topic_hours}
+        for topic_id, name, size_code, topic_hours in zip(
+            _unpack_ints(ids), names, _unpack_ints(size_codes), _unpack_ints(hours)
+        )
+    ]
+
+
+def encode_id_set(ids: dict[int, bool]) -> Packed:
+    return Packed("id_set", CODEC_VERSION, (_pack_ints(list(ids)),))
+
+
+def decode_id_set(packed: Packed) -> dict[int, bool]:
+    return dict.fromkeys(_unpack_ints(packed.columns[0]), True)
+
+
+_DECODERS = {
+    "plan_items": decode_plan_items,
+    "topics": decode_topics,
+    "id_set": decode_id_set,
+}
+
+
+def pack_fields(
+    state: dict[str, Any], encoders: dict[str, Any], drop_prefix: str = "__cached_"
+) -> dict[str, Any]:
+    """Replace the named fields of a __getstate__ dict with their packed form.
+
+    Entries starting with drop_prefix (computed var caches) are left out; the
+    vars recompute them on first access after loading.
+    """
+    packed = {
+        key: value for key, value in state.items() if not key.startswith(drop_prefix)
+    }
+    for field, encode in encoders.items():
+        if field in packed:
+            packed[field] = encode(packed[field])
+    return packed
+
+
+def unpack_fields(state: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of pack_fields; raises CodecVersionError for foreign layouts."""
+    for key, value in state.items():
+        if isinstance(value, Packed):
+            if value.version != CODEC_VERSION or value.kind not in _DECODERS:
+                raise CodecVersionError(
+                    f"{key}: {value.kind} v{value.version}, expected v{CODEC_VERSION}"
+                )
+            state[key] = _DECODERS[value.kind](value)
+    return state
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.db.session import asession
+
+logger = logging.getLogger(__name__)
+
+STATUS_FLUSH_INTERVAL = float(os.environ.get("PLAN_STATUS_FLUSH_INTERVAL", "2"))
+PLAN_STATUSES = ("Not Started", "In Progress", "Completed")
+
+
+class StatusWriteBuffer:
+    """Write-behind buffer for study plan status edits.
+
+    Edits are kept per row, so repeated changes to one item between flushes
+    collapse into a single UPDATE. Flushes run on a timer, before a student's
+    plan is reloaded, and on shutdown.
+    """
+
+    def __init__(self, flush_interval: float = STATUS_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.coalesced = 0
+        self.flushed = 0
+        # student_topics.id -> (student_id, status)
+        self._pending: dict[int, tuple[int, str]] = {}
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, student_id: int, item_id: int, status: str) -> None:
+        self.recorded += 1
+        if item_id in self._pending:
+            self.coalesced += 1
+        self._pending[item_id] = (student_id, status)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self, student_id: Optional[int] = None) -> int:
+        """Write pending edits (only student_id's, if given) in one batch."""
+        async with self._flush_lock:
+            if student_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {
+                    item_id: entry
+                    for item_id, entry in self._pending.items()
+                    if entry[0] == student_id
+                }
+                for item_id in batch:
+                    del self._pending[item_id]
+            if not batch:
+                return 0
+            try:
+                async with asession() as session:
+                    await session.execute(
+                        text(
+                            "UPDATE student_topics SET status = :status WHERE id = :id AND student_id = :student_id"
+                        ),
+                        [
+                            {"id": item_id, "student_id": owner, "status": status}
+                            for item_id, (owner, status) in batch.items()
+                        ],
+                    )
+                    await session.commit()
+            except Exception:
+                # Requeue without clobbering edits recorded while the write ran.
+                for item_id, entry in batch.items():
+                    self._pending.setdefault(item_id, entry)
+                raise
+            self.flushed += len(batch)
+            return len(batch)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+        }
+
+
+status_writer = StatusWriteBuffer()
+
+
+async def status_flush_task():
+    try:
+        while True:
+            await asyncio.sleep(status_writer.flush_interval)
+            try:
+                await status_writer.flush()
+            except Exception:
+                logger.exception("Flushing study plan statuses failed")
+    finally:
+        await status_writer.flush()
@@ -0,0 +1,133 @@
+import asyncio
+import re
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from typing import Iterable, Iterator, Optional, Sequence
+
+from app.pages.plan.catalog import CatalogIndex, Topic
+
+# Prefixes up to this length get their own posting list; longer query terms
+# are resolved through the sorted token list.
+MAX_PREFIX = 3
+# Above this many tokens sharing a long prefix, the short prefix posting is
+# cheaper to filter than a merge of every token's postings.
+MAX_MERGED_TOKENS = 64
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(value: str) -> list[str]:
+    return _TOKEN.findall(value.lower())
+
+
+def _unique(positions: Iterable[int]) -> Iterator[int]:
+    last = -1
+    for position in positions:
+        if position != last:
+            yield position
+            last = position
+
+
+class TopicSearchIndex:
+    """Prefix/token inverted index over the topic names of one subject."""
+
+    def __init__(self, topics: Sequence[Topic]):
+        self.topics = list(topics)
+        self._topic_tokens: list[tuple[str, ...]] = []
+        postings: dict[str, array] = {}
+        prefixes: dict[str, array] = {}
+        for position, topic in enumerate(self.topics):
+            tokens = tuple(dict.fromkeys(tokenize(topic["topic"] or "")))
+            self._topic_tokens.append(tokens)
+            seen: set[str] = set()
+            for token in tokens:
+                postings.setdefault(token, array("l")).append(position)
+                for n in range(1, min(len(token), MAX_PREFIX) + 1):
+                    prefix = token[:n]
+                    if prefix not in seen:
+                        seen.add(prefix)
+                        prefixes.setdefault(prefix, array("l")).append(position)
+        self._tokens = sorted(postings)
+        self._postings = [postings[token] for token in self._tokens]
+        self._prefixes = prefixes
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def _candidates(self, term: str) -> Iterable[int]:
+        """Ascending positions of topics that may contain a token starting with term."""
+        if len(term) <= MAX_PREFIX:
+            return self._prefixes.get(term, ())
+        lo = bisect_left(self._tokens, term)
+        hi = bisect_left(self._tokens, term + "\uffff", lo)
+        if hi - lo <= MAX_MERGED_TOKENS:
+            return _unique(merge(*self._postings[lo:hi]))
+        return self._prefixes.get(term[:MAX_PREFIX], ())
+
+    def search(self, query: str, limit: int) -> list[Topic]:
+        """First limit topics, in catalog order, matching every query term as a prefix.
+
+        A single term streams its posting list and stops after limit hits. With
+        several terms the candidate lists are intersected as sets, smallest
+        first, so the work stays in C rather than a per-topic Python check.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return self.topics[:limit]
+        if len(terms) == 1:
+            candidates: Iterable[int] = self._candidates(terms[0])
+        else:
+            postings = sorted(
+                (self._candidates(t) for t in terms), key=self._size_hint
+            )
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                if not matches:
+                    break
+                matches.intersection_update(posting)
+            candidates = sorted(matches)
+        found: list[Topic] = []
+        for position in candidates:
+            tokens = self._topic_tokens[position]
+            # Long terms may come from a shorter prefix list; check them exactly.
+            if all(any(tok.startswith(t) for tok in tokens) for t in terms):
+                found.append(self.topics[position])
+                if len(found) == limit:
+                    break
+        return found
+
+    @staticmethod
+    def _size_hint(posting: Iterable[int]) -> int:
+        # Merged postings are lazy but come from a narrow token range, so
+        # they are treated as the smallest list.
+        return len(posting) if isinstance(posting, array) else 0
+
+
+# Builds in flight or finished, so concurrent first searches share one build.
+_indexes: dict[int, "asyncio.Task[TopicSearchIndex]"] = {}
+_indexed_catalog: Optional[CatalogIndex] = None
+
+
+async def search_index(catalog: CatalogIndex, subject_id: int) -> TopicSearchIndex:
+    """The subject's index, built on first use and dropped when the catalog reloads.
+
+    Building a large subject takes about a second, so it runs in a thread
+    rather than stalling every client on the worker's event loop.
+    """
+    global _indexed_catalog
+    if _indexed_catalog is not catalog:
+        _indexes.clear()
+        _indexed_catalog = catalog
+    build = _indexes.get(subject_id)
+    if build is None:
+        build = _indexes[subject_id] = asyncio.create_task(
+            asyncio.to_thread(TopicSearchIndex, catalog.topics(subject_id))
+        )
+    try:
+        # A cancelled search must not cancel the build other searches wait on.
+        return await asyncio.shield(build)
+    except Exception:
+        if _indexes.get(subject_id) is build:
+            del _indexes[subject_id]
+        raise
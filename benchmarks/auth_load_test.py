@@ -0,0 +1,231 @@
+"""Concurrent load test for login, registration and session hydration.
+
+Drives the coroutines behind AuthState.handle_login, handle_registration and
+hydrate_user with N simulated clients against a throwaway SQLite database (or
+any URL passed with --db-url, e.g. a local MySQL). The test refuses to touch
+a database that already has accounts unless --reset is given, which deletes
+them. Requires aiosqlite for the default SQLite stand-in. Run from the
+repository root:
+
+    python -m benchmarks.auth_load_test --clients 50 --seconds 10
+    python -m benchmarks.auth_load_test --db-url mysql+pymysql://u:p@localhost/bench \\
+        --async-db-url mysql+aiomysql://u:p@localhost/bench --reset
+
+Results are printed as a table and written as JSON to --output.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+PASSWORD = "load-test-password"
+# Seeding replaces the contents of these tables.
+SEEDED_TABLES = ("localauthsession", "userinfo", "localuser")
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _seed(db_url: str, users: int, rounds: int, reset: bool) -> None:
+    import bcrypt
+    from sqlalchemy import create_engine, text
+
+    from app.db.migrations import bootstrap, upgrade
+
+    engine = create_engine(db_url)
+    bootstrap(engine)
+    upgrade(engine)
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds))
+    now = datetime.utcnow().isoformat()
+    with engine.begin() as conn:
+        populated = [
+            table
+            for table in SEEDED_TABLES
+            if conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first()
+        ]
+        if populated and not reset:
+            raise SystemExit(
+                f"{', '.join(populated)} already hold rows; pass --reset to delete "
+                "them (never against a database whose accounts matter)"
+            )
+        for table in SEEDED_TABLES:
+            conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(
+            text(
+                "INSERT INTO localuser (id, username, password_hash, enabled) VALUES (:id, :username, :password, 1)"
+            ),
+            [
+                {"id": i, "username": f"user{i}", "password": hashed}
+                for i in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            text(
+                "INSERT INTO userinfo (email, user_id, created_at, updated_at) VALUES (:email, :user_id, :now, :now)"
+            ),
+            [
+                {"email": f"user{i}@example.com", "user_id": i, "now": now}
+                for i in range(1, users + 1)
+            ],
+        )
+    engine.dispose()
+
+
+async def _drive(
+    op: Callable[[int, int], Awaitable[object]], clients: int, seconds: float
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(client_id: int) -> None:
+        nonlocal errors
+        iteration = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await op(client_id, iteration)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            iteration += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from app.pages.auth import auth_backend
+    from app.pages.auth.session_cache import session_cache
+
+    run_id = int(time.time())
+    tokens: list[str] = []
+    for i in range(min(args.users, 200)):
+        login = await auth_backend.authenticate(f"user{i + 1}", PASSWORD)
+        tokens.append(login[1])
+
+    async def login(client_id: int, iteration: int) -> None:
+        user = random.randint(1, args.users)
+        assert await auth_backend.authenticate(f"user{user}", PASSWORD)
+
+    async def register(client_id: int, iteration: int) -> None:
+        name = f"new{run_id}-{client_id}-{iteration}"
+        error = await auth_backend.register_user(name, f"{name}@example.com", PASSWORD)
+        assert error is None, error
+
+    async def hydrate(client_id: int, iteration: int) -> None:
+        if args.cold_hydration:
+            session_cache.clear()
+        assert await auth_backend.resolve_session(random.choice(tokens))
+
+    scenarios = {"login": login, "register": register, "hydrate": hydrate}
+    results = {}
+    for name in args.scenarios:
+        latencies, errors, elapsed = await _drive(
+            scenarios[name], args.clients, args.seconds
+        )
+        results[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "seconds": elapsed,
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+        }
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url")
+    parser.add_argument("--async-db-url")
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="delete existing sessions and accounts in --db-url before seeding",
+    )
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--rounds", type=int, default=4, help="bcrypt cost for seeded and new users"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", default=["login", "register", "hydrate"]
+    )
+    parser.add_argument(
+        "--cold-hydration",
+        action="store_true",
+        help="clear the session cache before every hydration",
+    )
+    parser.add_argument("--output", default="auth_load_results.json")
+    args = parser.parse_args()
+
+    if args.db_url is None:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.db_url = f"sqlite:///{path}"
+        args.async_db_url = f"sqlite+aiosqlite:///{path}"
+    # Reflex reads the database settings from the environment on first use.
+    os.environ["REFLEX_DB_URL"] = args.db_url
+    if args.async_db_url:
+        os.environ["REFLEX_ASYNC_DB_URL"] = args.async_db_url
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+
+    _seed(args.db_url, args.users, args.rounds, args.reset)
+    from app.pages.auth.password_hasher import password_hasher
+
+    password_hasher.rounds = args.rounds
+    results = asyncio.run(_run(args))
+
+    print(
+        f"{'scenario':<10} {'requests':>9} {'errors':>7} {'rps':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+    report = {
+        "benchmark": "auth_load_test",
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": _git_revision(),
+        "params": {
+            "clients": args.clients,
+            "seconds": args.seconds,
+            "users": args.users,
+            "rounds": args.rounds,
+            "cold_hydration": args.cold_hydration,
+            "database": args.db_url.split("://")[0],
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
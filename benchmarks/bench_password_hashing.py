@@ -0,0 +1,54 @@
+"""Login throughput of the password hasher as the worker count grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_password_hashing --requests 64 --kind thread
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import bcrypt
+
+from app.pages.auth.password_hasher import PasswordHasher
+
+
+async def _run(hasher: PasswordHasher, hashed: bytes, requests: int) -> float:
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(hasher.verify("correct horse battery", hashed) for _ in range(requests))
+    )
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--kind", choices=["thread", "process"], default="thread")
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(b"correct horse battery", bcrypt.gensalt(args.rounds))
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'logins/s':>9} {'speedup':>8}")
+    for workers in worker_counts:
+        hasher = PasswordHasher(args.kind, workers, max_queue=args.requests)
+        try:
+            elapsed = asyncio.run(_run(hasher, hashed, args.requests))
+        finally:
+            hasher.shutdown()
+        throughput = args.requests / elapsed
+        baseline = baseline or throughput
+        print(
+            f"{workers:>8} {elapsed:>9.2f} {throughput:>9.1f} {throughput / baseline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
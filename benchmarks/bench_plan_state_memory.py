@@ -0,0 +1,171 @@
+"""Per-session memory held by PlanState, baseline layout vs current.
+
+Builds N real Reflex state instances, all looking at the same subject with
+half of its topics selected, in two layouts:
+
+    baseline  BaselinePlanState below: the field set PlanState had before the
+              shared catalog, with levels, boards, subjects and topics loaded
+              into each session as fresh rows, as its SQL handlers did
+    current   PlanState(_reflex_internal_init=True), driven through the same
+              helpers its handlers use; computed vars are read once so their
+              caches are populated as after a render
+
+Run from the repository root:
+
+    python -m benchmarks.bench_plan_state_memory
+    python -m benchmarks.bench_plan_state_memory --sessions 5000 --topics 2000
+"""
+
+import argparse
+import tracemalloc
+from collections import namedtuple
+
+import reflex as rx
+
+from app.pages.plan import catalog as catalog_module
+from app.pages.plan.catalog import CatalogIndex
+from app.pages.plan.plan_backend import PlanState
+
+SubjectRow = namedtuple("SubjectRow", "id level board subject examcode examdate")
+TopicRow = namedtuple("TopicRow", "id subjectid topic size hours")
+
+
+class BaselinePlanState(rx.State):
+    """The catalog and selection fields of PlanState before the shared catalog."""
+
+    available_levels: list[str] = []
+    available_boards: list[str] = []
+    available_subjects: list[dict] = []
+    available_topics: list[dict] = []
+    selected_level: str = ""
+    selected_board: str = ""
+    selected_subject_id: int = 0
+    selected_exam_date: str = ""
+    selected_topic_ids: list[int] = []
+    study_plan_items: list[dict] = []
+    loading: bool = False
+    generation_in_progress: bool = False
+
+    @rx.var
+    def total_study_hours(self) -> int:
+        return sum(
+            topic["hours"]
+            for topic in self.available_topics
+            if topic["id"] in self.selected_topic_ids
+        )
+
+
+def _catalog(subjects: int, topics: int) -> CatalogIndex:
+    subject_rows = [
+        SubjectRow(
+            i,
+            f"Level {i % 3}",
+            f"Board {i % 4}",
+            f"Subject {i}",
+            f"CODE{i:04d}",
+            "2027-06-01",
+        )
+        for i in range(subjects)
+    ]
+    topic_rows = [
+        TopicRow(
+            s * topics + t,
+            s,
+            f"Topic {t} of subject {s}",
+            ("Small", "Medium", "Large")[t % 3],
+            t % 8 + 1,
+        )
+        for s in range(subjects)
+        for t in range(topics)
+    ]
+    return CatalogIndex(1, subject_rows, topic_rows)
+
+
+def _fetched(value: str) -> str:
+    # A new str object, as each SQL fetch in the baseline handlers produced.
+    return value.encode().decode()
+
+
+def _baseline_session(catalog: CatalogIndex, level: str, board: str, subject_id: int):
+    state = BaselinePlanState(_reflex_internal_init=True)
+    state.available_levels = [_fetched(x) for x in catalog.levels]
+    state.selected_level = level
+    state.available_boards = [_fetched(x) for x in catalog.boards(level)]
+    state.selected_board = board
+    state.available_subjects = [
+        {k: _fetched(v) if isinstance(v, str) else v for k, v in s.items()}
+        for s in catalog.subjects(level, board)
+    ]
+    state.selected_subject_id = subject_id
+    state.selected_exam_date = _fetched(catalog.subject(subject_id)["examdate"])
+    state.available_topics = [
+        {k: _fetched(v) if isinstance(v, str) else v for k, v in t.items()}
+        for t in catalog.topics(subject_id)
+    ]
+    state.selected_topic_ids = [t["id"] for t in catalog.topics(subject_id)[::2]]
+    state.total_study_hours
+    return state
+
+
+def _current_session(catalog: CatalogIndex, level: str, board: str, subject_id: int):
+    state = PlanState(_reflex_internal_init=True)
+    state.selected_level = level
+    state.selected_board = board
+    state.selected_subject_id = subject_id
+    state.selected_exam_date = catalog.subject(subject_id)["examdate"]
+    state._show_topics(catalog)
+    state._set_selection(
+        dict.fromkeys((t["id"] for t in catalog.topics(subject_id)[::2]), True)
+    )
+    for var in ("available_levels", "available_boards", "available_subjects"):
+        getattr(state, var)
+    state.topic_sizes
+    state.topic_count
+    return state
+
+
+LAYOUTS = {"baseline": _baseline_session, "current": _current_session}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--subjects", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=500, help="topics per subject")
+    args = parser.parse_args()
+
+    catalog = _catalog(args.subjects, args.topics)
+    # Computed vars read the process-wide catalog that get_catalog() would load.
+    catalog_module._catalog = catalog
+    level, board = catalog.levels[0], catalog.boards(catalog.levels[0])[0]
+    subject_id = catalog.subjects(level, board)[0]["id"]
+    # Build the shared per-subject views once, outside the measurement.
+    catalog.topic_hours(subject_id)
+    catalog.topic_sizes(subject_id)
+
+    print(
+        f"{args.sessions} sessions, {len(catalog.subjects(level, board))} subjects "
+        f"in the board, {len(catalog.topics(subject_id))} topics in the subject"
+    )
+    print(
+        f"{'layout':<9} {'bytes/session':>14} {'total MiB':>10} "
+        f"{'serialized/session':>19}"
+    )
+    for name, build in LAYOUTS.items():
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [
+            build(catalog, level, board, subject_id) for _ in range(args.sessions)
+        ]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        serialized = len(sessions[0]._serialize())
+        print(
+            f"{name:<9} {used // args.sessions:>14} {used / 2**20:>10.1f} "
+            f"{serialized:>19}"
+        )
+        del sessions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Signup throughput: pre-SELECT registration versus insert-and-catch-conflict.
+
+    legacy    the baseline handler's statements (two SELECTs, an INSERT, a
+              LAST_INSERT_ID lookup and a second INSERT), kept here as the
+              reference point since the app no longer ships them
+    shipped   auth_backend.register_user, exactly as the signup form calls it
+
+Both paths hash with the app's password_hasher at --rounds (default 4, so
+bcrypt does not drown out the database work). Requires aiosqlite for the
+default throwaway SQLite database. Run from the repository root:
+
+    python -m benchmarks.bench_registration --users 2000
+    python -m benchmarks.bench_registration --db-url mysql+pymysql://u:p@localhost/bench \\
+        --async-db-url mysql+aiomysql://u:p@localhost/bench
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+
+async def register_legacy(username: str, email: str, password: str) -> bool:
+    from sqlalchemy import text
+
+    from app.db.session import asession
+    from app.pages.auth.password_hasher import password_hasher
+
+    hashed_password = await password_hasher.hash(password)
+    async with asession() as session:
+        async with session.begin():
+            if (
+                await session.execute(
+                    text("SELECT id FROM localuser WHERE username = :username"),
+                    {"username": username},
+                )
+            ).first():
+                return False
+            if (
+                await session.execute(
+                    text("SELECT user_id FROM userinfo WHERE email = :email"),
+                    {"email": email},
+                )
+            ).first():
+                return False
+            await session.execute(
+                text(
+                    "INSERT INTO localuser (username, password_hash, enabled) VALUES (:username, :password, :enabled)"
+                ),
+                {"username": username, "password": hashed_password, "enabled": 1},
+            )
+            last_id = (
+                "LAST_INSERT_ID()"
+                if session.bind.dialect.name == "mysql"
+                else "last_insert_rowid()"
+            )
+            result = await session.execute(text(f"SELECT {last_id} AS id"))
+            await session.execute(
+                text(
+                    "INSERT INTO userinfo (email, user_id, created_at, updated_at) VALUES (:email, :user_id, :created, :updated)"
+                ),
+                {
+                    "email": email,
+                    "user_id": result.scalar_one(),
+                    "created": datetime.utcnow().isoformat(),
+                    "updated": datetime.utcnow().isoformat(),
+                },
+            )
+    return True
+
+
+async def register_shipped(username: str, email: str, password: str) -> bool:
+    from app.pages.auth.auth_backend import register_user
+
+    return await register_user(username, email, password) is None
+
+
+async def _bench(register, prefix: str, users: int) -> float:
+    start = time.perf_counter()
+    for i in range(users):
+        name = f"{prefix}{i}"
+        assert await register(name, f"{name}@example.com", "bench-password")
+    # Every tenth signup is a duplicate, exercising the conflict path.
+    for i in range(0, users, 10):
+        name = f"{prefix}{i}"
+        assert not await register(name, f"{name}@example.com", "bench-password")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", help="sync URL, used to create the tables")
+    parser.add_argument("--async-db-url", help="async URL the app connects with")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost")
+    args = parser.parse_args()
+
+    if args.db_url is None:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.db_url = f"sqlite:///{path}"
+        args.async_db_url = f"sqlite+aiosqlite:///{path}"
+    # Reflex reads the database settings from the environment on first use.
+    os.environ["REFLEX_DB_URL"] = args.db_url
+    if args.async_db_url:
+        os.environ["REFLEX_ASYNC_DB_URL"] = args.async_db_url
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+
+    from sqlalchemy import create_engine
+
+    from app.db.migrations import bootstrap, upgrade
+    from app.pages.auth.password_hasher import password_hasher
+
+    engine = create_engine(args.db_url)
+    bootstrap(engine)
+    upgrade(engine)
+    password_hasher.rounds = args.rounds
+    attempts = args.users + len(range(0, args.users, 10))
+    for label, register in (
+        ("legacy (5 statements)", register_legacy),
+        ("shipped register_user", register_shipped),
+    ):
+        elapsed = asyncio.run(_bench(register, label.split()[0], args.users))
+        print(f"{label:<34} {elapsed:>7.2f}s {attempts / elapsed:>9.1f} signups/s")
+
+
+if __name__ == "__main__":
+    main()
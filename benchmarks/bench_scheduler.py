@@ -0,0 +1,65 @@
+"""Scheduler throughput on synthetic catalogs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scheduler
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from app.pages.plan.scheduler import StudyTask, plan_subject, schedule_edf
+
+SINGLE_SUBJECT_CASES = [(100, 30), (1_000, 120), (5_000, 365), (20_000, 365)]
+MULTI_SUBJECT_CASES = [(5, 200), (20, 500), (50, 1_000)]
+
+
+def _best_of(runs: int, fn) -> tuple[float, object]:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    rng = random.Random(42)
+    start = date(2026, 1, 1)
+
+    print("Single subject, paced evenly (plan_subject)")
+    print(f"{'topics':>8} {'days':>6} {'blocks':>8} {'ms':>8}")
+    for topic_count, days in SINGLE_SUBJECT_CASES:
+        topics = [(i, rng.randint(0, 12)) for i in range(topic_count)]
+        total = sum(hours for _, hours in topics)
+        daily_cap = -(-total // days)
+        exam = start + timedelta(days=days)
+        elapsed, schedule = _best_of(
+            5, lambda: plan_subject(topics, start, exam, daily_cap)
+        )
+        print(
+            f"{topic_count:>8} {days:>6} {len(schedule.blocks):>8} {elapsed * 1000:>8.2f}"
+        )
+
+    print("\nMany subjects, earliest deadline first (schedule_edf)")
+    print(f"{'subjects':>8} {'topics':>8} {'blocks':>8} {'missed h':>9} {'ms':>8}")
+    for subject_count, topics_per_subject in MULTI_SUBJECT_CASES:
+        tasks = [
+            StudyTask(s * topics_per_subject + i, rng.randint(1, 8), deadline)
+            for s in range(subject_count)
+            for deadline in [start + timedelta(days=rng.randint(60, 365))]
+            for i in range(topics_per_subject)
+        ]
+        daily_cap = -(-sum(t.hours for t in tasks) // 200)
+        elapsed, schedule = _best_of(
+            5, lambda: schedule_edf(tasks, start, lambda d: daily_cap)
+        )
+        print(
+            f"{subject_count:>8} {len(tasks):>8} {len(schedule.blocks):>8} "
+            f"{sum(schedule.missed.values()):>9} {elapsed * 1000:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
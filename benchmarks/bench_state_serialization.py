@@ -0,0 +1,163 @@
+"""PlanState pickle size and Redis load/store latency, plain vs packed.
+
+Models the __getstate__ dict of one PlanState (plan rows, topic search
+window, selection and computed var caches) and round-trips it through an
+in-process Redis stand-in, the way StateManagerRedis does per substate:
+
+    plain   the dict Reflex pickles by default
+    packed  hot list fields in columnar form, computed var caches dropped
+
+The packed layout trades slower stores for a smaller payload: one run
+measured 7846 -> 2597 bytes at 50 rows with store p50 about 25-35% slower
+(103 -> 128 us) and load about the same (112 -> 101 us); at 500 rows,
+30.8 KB -> 6.8 KB, store p50 about 28% slower and load about 16% faster.
+The encoding runs in Python, so it pays off in Redis memory and network
+bytes, not in CPU time per store.
+
+Needs fakeredis (pip install fakeredis). Run from the repository root:
+
+    python -m benchmarks.bench_state_serialization
+    python -m benchmarks.bench_state_serialization --items 500 --repeat 5000
+"""
+
+import argparse
+import pickle
+import time
+from datetime import date, timedelta
+
+import fakeredis
+
+from app.pages.plan.state_codec import (
+    encode_id_set,
+    encode_plan_items,
+    encode_topics,
+    pack_fields,
+    unpack_fields,
+)
+
+PACKED_FIELDS = {
+    "study_plan_items": encode_plan_items,
+    "visible_topics": encode_topics,
+    "selected_topic_ids": encode_id_set,
+}
+STATUSES = ("Not Started", "In Progress", "Completed")
+SIZES = ("Small", "Medium", "Large")
+
+
+class PlainState:
+    def __init__(self, fields: dict):
+        self.__dict__.update(fields)
+
+
+class PackedState(PlainState):
+    def __getstate__(self):
+        return pack_fields(self.__dict__.copy(), PACKED_FIELDS)
+
+    def __setstate__(self, state):
+        self.__dict__.update(unpack_fields(state))
+
+
+def _fields(items: int, topics: int) -> dict:
+    start = date(2027, 1, 4)
+    plan = [
+        {
+            "id": 10_000 + i,
+            "date": (start + timedelta(days=i // 4)).isoformat(),
+            "subject": f"Subject {i % 3}",
+            "hours": i % 4 + 1,
+            "status": STATUSES[i % 7 // 3],
+            "student_topic_id": 10_000 + i,
+        }
+        for i in range(items)
+    ]
+    window = [
+        {
+            "id": i,
+            "topic": f"Topic {i} of subject 0",
+            "size": SIZES[i % 3],
+            "hours": i % 8 + 1,
+        }
+        for i in range(topics)
+    ]
+    return {
+        "catalog_version": 3,
+        "visible_topics": window,
+        "topic_query": "",
+        "selected_level": "Level 0",
+        "selected_board": "Board 0",
+        "selected_subject_id": 0,
+        "selected_exam_date": "2027-06-01",
+        "selected_topic_ids": dict.fromkeys(range(0, topics, 2), True),
+        "selected_topic_count": len(range(0, topics, 2)),
+        "total_study_hours": 0,
+        "study_plan_items": plan,
+        "loading": False,
+        "generation_in_progress": False,
+        "plan_error": "",
+        "plan_first_page": 0,
+        "plan_has_more": True,
+        "plan_fetching": False,
+        "_plan_cursors": [None],
+        "_plan_window": [items],
+        "dirty_vars": set(),
+        "dirty_substates": set(),
+        "__cached_available_levels": [f"Level {i}" for i in range(3)],
+        "__cached_available_boards": [f"Board {i}" for i in range(4)],
+        "__cached_available_subjects": [
+            {
+                "id": i,
+                "subject": f"Subject {i}",
+                "examcode": f"CODE{i:04d}",
+                "examdate": "2027-06-01",
+            }
+            for i in range(50)
+        ],
+        "__cached_topic_sizes": list(SIZES),
+        "__cached_topic_count": 500,
+    }
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50, help="plan rows held")
+    parser.add_argument("--topics", type=int, default=50, help="topic window size")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    redis = fakeredis.FakeRedis()
+    fields = _fields(args.items, args.topics)
+    print(f"{args.items} plan rows, {args.topics} visible topics, {args.repeat} rounds")
+    print(
+        f"{'layout':<8} {'bytes':>7} {'store p50 us':>13} {'store p99 us':>13} "
+        f"{'load p50 us':>12} {'load p99 us':>12}"
+    )
+    for name, cls in (("plain", PlainState), ("packed", PackedState)):
+        state = cls(fields)
+        key = f"token_{name}_plan_state"
+        stores, loads = [], []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            redis.set(key, pickle.dumps(state))
+            t1 = time.perf_counter()
+            loaded = pickle.loads(redis.get(key))
+            t2 = time.perf_counter()
+            stores.append(t1 - t0)
+            loads.append(t2 - t1)
+        assert loaded.study_plan_items == fields["study_plan_items"]
+        assert loaded.visible_topics == fields["visible_topics"]
+        size = len(pickle.dumps(state))
+        store = [_percentile(stores, q) * 1e6 for q in (0.5, 0.99)]
+        load = [_percentile(loads, q) * 1e6 for q in (0.5, 0.99)]
+        print(
+            f"{name:<8} {size:>7} {store[0]:>13.1f} {store[1]:>13.1f} "
+            f"{load[0]:>12.1f} {load[1]:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
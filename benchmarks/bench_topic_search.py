@@ -0,0 +1,72 @@
+"""Topic search latency on a synthetic 100k-topic subject.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_topic_search
+    python -m benchmarks.bench_topic_search --topics 500000 --limit 20
+"""
+
+import argparse
+import random
+import time
+
+from app.pages.plan.catalog import Topic
+from app.pages.plan.topic_search import TopicSearchIndex
+
+TARGET_MS = 5.0
+QUERIES = ["a", "ph", "cel", "photo", "thermo", "cell div", "org chem re", "zzz"]
+SYLLABLES = ["ph", "o", "to", "syn", "the", "sis", "cel", "l", "di", "vi", "org",
+             "an", "ic", "chem", "re", "ac", "tion", "ther", "mo", "dy", "nam"]
+
+
+def _words(rng: random.Random, count: int) -> list[str]:
+    return [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+        for _ in range(count)
+    ]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = _words(rng, 5_000)
+    names = sorted(
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(2, 5)))
+        for _ in range(args.topics)
+    )
+    topics = [
+        Topic(id=i, topic=name, size="Medium", hours=rng.randint(1, 8))
+        for i, name in enumerate(names)
+    ]
+
+    t0 = time.perf_counter()
+    index = TopicSearchIndex(topics)
+    print(f"built index over {len(index)} topics in {time.perf_counter() - t0:.2f} s")
+
+    print(f"{'query':<14} {'hits':>5} {'p50 ms':>8} {'p99 ms':>8}")
+    worst = 0.0
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            hits = index.search(query, args.limit)
+            samples.append((time.perf_counter() - t0) * 1000)
+        p99 = _percentile(samples, 0.99)
+        worst = max(worst, p99)
+        print(f"{query:<14} {len(hits):>5} {_percentile(samples, 0.5):>8.3f} {p99:>8.3f}")
+    verdict = "ok" if worst < TARGET_MS else "over target"
+    print(f"worst p99 {worst:.3f} ms (target {TARGET_MS} ms): {verdict}")
+
+
+if __name__ == "__main__":
+    main()
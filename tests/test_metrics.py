@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.monitoring import metrics
+from app.monitoring.metrics import metrics_endpoint, registry
+from app.monitoring.reflex_hooks import _hook_delta_size
+
+ROUTES = [Route("/metrics", metrics_endpoint)]
+
+
+def _client(host: str) -> TestClient:
+    return TestClient(Starlette(routes=ROUTES), client=(host, 50000))
+
+
+def test_metrics_refuses_remote_clients_without_a_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    assert _client("203.0.113.9").get("/metrics").status_code == 403
+    assert _client("127.0.0.1").get("/metrics").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [(None, 403), ("Bearer wrong", 403), ("Basic s3cret", 403), ("Bearer s3cret", 200)],
+)
+def test_metrics_token(monkeypatch, header, status):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    headers = {"Authorization": header} if header else {}
+    assert _client("127.0.0.1").get("/metrics", headers=headers).status_code == status
+
+
+def test_update_frames_are_sized_once(monkeypatch):
+    from socketio.packet import EVENT, Packet
+
+    monkeypatch.setattr(Packet, "encode", Packet.encode)
+    _hook_delta_size()
+    calls = []
+
+    def dumps(data, **kwargs):
+        calls.append(data)
+        return json.dumps(data, **kwargs)
+
+    monkeypatch.setattr(Packet, "json", SimpleNamespace(dumps=dumps))
+    token = metrics.current_event.set("PlanState.load_plan")
+    try:
+        encoded = Packet(EVENT, ["event", {"delta": {"s": {"x": 1}}}]).encode()
+    finally:
+        metrics.current_event.reset(token)
+    assert len(calls) == 1
+    text = registry.render()
+    assert 'reflex_state_delta_bytes_count{event="PlanState.load_plan"}' in text
+    assert f'reflex_state_delta_bytes_sum{{event="PlanState.load_plan"}} {len(encoded)}' in text
@@ -0,0 +1,74 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.explain_check import check_hot_paths
+from app.db.migrations import _student_topics_id, bootstrap, upgrade
+
+
+def test_schema_sql_layout_upgrades_to_indexed_hot_paths(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    bootstrap(engine)
+    upgrade(engine, target=4)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO student_topics (student_id, subject) VALUES (1, 'A')")
+        )
+    upgrade(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM student_topics")).scalar() == 1
+    indexes = {i["name"] for i in inspect(engine).get_indexes("student_topics")}
+    assert "ix_student_topics_student_id" in indexes
+    assert check_hot_paths(engine) == []
+
+
+def test_id_rebuild_keeps_not_null_and_defaults(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE student_topics (student_id INTEGER, "
+                "status VARCHAR(20) NOT NULL DEFAULT 'Not Started')"
+            )
+        )
+        conn.execute(text("CREATE INDEX ix_st ON student_topics (student_id)"))
+        conn.execute(text("INSERT INTO student_topics (student_id) VALUES (1)"))
+        _student_topics_id(conn)
+        conn.execute(text("INSERT INTO student_topics (student_id) VALUES (2)"))
+        rows = conn.execute(
+            text("SELECT id, student_id, status FROM student_topics ORDER BY id")
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [(1, 1, "Not Started"), (2, 2, "Not Started")]
+    status = next(
+        c
+        for c in inspect(engine).get_columns("student_topics")
+        if c["name"] == "status"
+    )
+    assert not status["nullable"]
+    assert "ix_st" in {i["name"] for i in inspect(engine).get_indexes("student_topics")}
+
+
+def test_legacy_rows_with_null_examcode_get_topic_and_subject(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    bootstrap(engine)
+    upgrade(engine, target=4)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO subjects (id, level, board, subject, examcode) "
+                "VALUES (7, 'GCSE', 'AQA', 'Biology', NULL)"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO topics (id, subjectid, topic) VALUES (70, 7, 'Cells')")
+        )
+        conn.execute(
+            text(
+                "INSERT INTO student_topics (student_id, level, subject, examboard) "
+                "VALUES (1, 'GCSE', 'Cells', 'AQA')"
+            )
+        )
+    upgrade(engine)
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT topic_id, subject_id FROM student_topics")
+        ).one()
+    assert tuple(row) == (70, 7)
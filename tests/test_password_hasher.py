@@ -0,0 +1,19 @@
+import bcrypt
+
+from app.pages.auth.password_hasher import PasswordHasher
+
+HASH_4 = bcrypt.hashpw(b"password", bcrypt.gensalt(4))
+
+
+def test_no_rehash_before_calibration():
+    hasher = PasswordHasher()
+    hasher.rounds = 5
+    assert not hasher.needs_rehash(HASH_4)
+
+
+def test_rehash_to_the_calibrated_cost():
+    hasher = PasswordHasher()
+    hasher.rounds, hasher.calibrated = 5, True
+    assert hasher.needs_rehash(HASH_4)
+    hasher.rounds = 4
+    assert not hasher.needs_rehash(HASH_4)
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from app.pages.plan.plan_diff import (
+    ExistingRow,
+    diff_plan,
+    remaining_hours,
+    split_kept_rows,
+)
+from app.pages.plan.scheduler import ScheduledBlock, plan_subject
+
+DAY0 = date(2027, 1, 4)
+EXAM = DAY0 + timedelta(days=30)
+EXAMDATE = EXAM.isoformat()
+TOPICS = [(1, 6), (2, 6), (3, 6)]
+
+
+def _rows(blocks, statuses=None) -> list[ExistingRow]:
+    statuses = statuses or {}
+    return [
+        ExistingRow(
+            i, b.topic_id, b.day, b.hours, EXAMDATE, statuses.get(i, "Not Started")
+        )
+        for i, b in enumerate(blocks, start=1)
+    ]
+
+
+def _apply(rows, diff) -> list[ExistingRow]:
+    """The rows a diff leaves behind, new rows numbered after the old ones."""
+    by_id = {r.id: r for r in rows}
+    for row_id in diff.deletes:
+        del by_id[row_id]
+    for row_id, block in diff.updates:
+        by_id[row_id] = by_id[row_id]._replace(study_date=block.day, hours=block.hours)
+    next_id = max(by_id, default=0) + 1
+    for block in diff.inserts:
+        by_id[next_id] = ExistingRow(
+            next_id, block.topic_id, block.day, block.hours, EXAMDATE
+        )
+        next_id += 1
+    return list(by_id.values())
+
+
+def _regenerate(rows, today):
+    kept, open_rows = split_kept_rows(rows, today)
+    schedule = plan_subject(remaining_hours(TOPICS, kept), today, EXAM)
+    return kept, diff_plan(open_rows, schedule.blocks, EXAMDATE)
+
+
+def test_regenerating_later_keeps_history_and_plans_only_what_is_left():
+    rows = _rows(plan_subject(TOPICS, DAY0, EXAM).blocks)
+    later = DAY0 + timedelta(days=10)
+    past = [r for r in rows if r.study_date < later]
+    assert past
+    kept, diff = _regenerate(rows, later)
+    assert kept == past
+    assert not set(diff.deletes) & {r.id for r in past}
+    after = _apply(rows, diff)
+    assert all(r in after for r in past)
+    assert sum(r.hours for r in after) == sum(h for _, h in TOPICS)
+    assert all(r.study_date >= later for r in after if r not in past)
+
+
+def test_regenerating_the_next_day_moves_rows_in_place():
+    rows = _rows(plan_subject(TOPICS, DAY0, EXAM).blocks)
+    kept, diff = _regenerate(rows, DAY0 + timedelta(days=1))
+    planned = sum(r.hours for r in rows if r not in kept)
+    topic_of = {r.id: r.topic_id for r in rows}
+    deleted_topics = {topic_of[row_id] for row_id in diff.deletes}
+    # A topic's rows are moved, never deleted and re-inserted.
+    assert not deleted_topics & {b.topic_id for b in diff.inserts}
+    assert diff.updates
+    assert sum(r.hours for r in _apply(rows, diff) if r not in kept) == planned
+
+
+def test_started_rows_are_kept_and_their_hours_counted():
+    rows = _rows(plan_subject(TOPICS, DAY0, EXAM).blocks)
+    future = rows[-1]
+    rows = _rows(plan_subject(TOPICS, DAY0, EXAM).blocks, {future.id: "In Progress"})
+    kept, diff = _regenerate(rows, DAY0)
+    assert [r.id for r in kept] == [future.id]
+    assert future.id not in diff.deletes + [i for i, _ in diff.updates]
+    assert sum(r.hours for r in _apply(rows, diff)) == sum(h for _, h in TOPICS)
+
+
+def test_rows_of_unselected_topics_are_deleted():
+    rows = [ExistingRow(1, 9, DAY0, 2, EXAMDATE)]
+    diff = diff_plan(rows, [ScheduledBlock(DAY0, 1, 2)], EXAMDATE)
+    assert diff.deletes == [1]
+    assert diff.inserts == [ScheduledBlock(DAY0, 1, 2)]
+
+
+def test_unchanged_plan_is_empty():
+    rows = _rows(plan_subject(TOPICS, DAY0, EXAM).blocks)
+    assert diff_plan(rows, plan_subject(TOPICS, DAY0, EXAM).blocks, EXAMDATE).is_empty
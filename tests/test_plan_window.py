@@ -0,0 +1,38 @@
+from app.pages.plan.plan_backend import PLAN_WINDOW_PAGES, PlanState
+
+
+def _page(n: int, size: int = 2) -> list[dict]:
+    return [{"id": n * size + i, "page": n} for i in range(size)]
+
+
+def _scroll_down(state: PlanState, pages: int) -> None:
+    state._plan_cursors = [None, ("2027-01-01", 0)]
+    state._plan_window = [len(_page(0))]
+    state.study_plan_items = _page(0)
+    for page in range(1, pages):
+        state._append_plan_page(page, _page(page), ("2027-01-01", page))
+
+
+def test_scrolling_down_keeps_a_bounded_window():
+    state = PlanState(_reflex_internal_init=True)
+    _scroll_down(state, PLAN_WINDOW_PAGES + 2)
+    assert state.plan_first_page == 2
+    assert [r["page"] for r in state.study_plan_items][::2] == list(
+        range(2, PLAN_WINDOW_PAGES + 2)
+    )
+    assert len(state._plan_cursors) == PLAN_WINDOW_PAGES + 3
+    assert state.plan_has_more
+
+
+def test_scrolling_back_up_drops_the_last_page():
+    state = PlanState(_reflex_internal_init=True)
+    _scroll_down(state, PLAN_WINDOW_PAGES + 1)
+    state._append_plan_page(PLAN_WINDOW_PAGES + 1, _page(PLAN_WINDOW_PAGES + 1), None)
+    assert not state.plan_has_more
+    state._prepend_plan_page(1, _page(1))
+    pages = [r["page"] for r in state.study_plan_items][::2]
+    assert pages == list(range(1, PLAN_WINDOW_PAGES + 1))
+    assert state.plan_first_page == 1
+    assert state.plan_has_more
+    assert sum(state._plan_window) == len(state.study_plan_items)
+
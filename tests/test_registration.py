@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.pages.auth.auth_backend import (
+    MAX_EMAIL_LENGTH,
+    MAX_USERNAME_LENGTH,
+    _registration_conflict_message,
+    _registration_input_error,
+)
+
+
+def _integrity_error(message: str) -> IntegrityError:
+    return IntegrityError("INSERT ...", {}, Exception(message))
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("UNIQUE constraint failed: localuser.username", "Username already exists."),
+        (
+            "(1062, \"Duplicate entry 'bob' for key 'localuser.ux_localuser_username'\")",
+            "Username already exists.",
+        ),
+        ("UNIQUE constraint failed: userinfo.email", "Email already registered."),
+        (
+            "(1062, \"Duplicate entry 'b@x' for key 'userinfo.ux_userinfo_email'\")",
+            "Email already registered.",
+        ),
+        ("NOT NULL constraint failed: localuser.username", None),
+        ("(1048, \"Column 'email' cannot be null\")", None),
+    ],
+)
+def test_only_unique_violations_are_conflicts(message, expected):
+    assert _registration_conflict_message(_integrity_error(message)) == expected
+
+
+@pytest.mark.parametrize(
+    "username, email",
+    [
+        (None, "a@b"),
+        ("  ", "a@b"),
+        ("alice", ""),
+        ("a" * (MAX_USERNAME_LENGTH + 1), "a@b"),
+        ("alice", "a" * (MAX_EMAIL_LENGTH + 1)),
+    ],
+)
+def test_invalid_registration_input(username, email):
+    assert _registration_input_error(username, email)
+
+
+def test_valid_registration_input():
+    assert _registration_input_error("a" * MAX_USERNAME_LENGTH, "a@b") is None
@@ -0,0 +1,80 @@
+from collections import namedtuple
+from datetime import date, timedelta
+
+import pytest
+
+from app.pages.plan.scheduler import (
+    ScheduleError,
+    SubjectTasks,
+    parse_exam_date,
+    plan_subject,
+    plan_subjects,
+)
+
+TODAY = date(2027, 1, 4)
+CAP = 4
+
+Row = namedtuple("Row", "id subject_id topic_id study_date hours examdate")
+
+
+def _daily_totals(blocks) -> dict[date, int]:
+    totals: dict[date, int] = {}
+    for block in blocks:
+        totals[block.day] = totals.get(block.day, 0) + block.hours
+    return totals
+
+
+def test_later_exam_yields_days_to_an_earlier_one():
+    exam_a, exam_b = TODAY + timedelta(days=60), TODAY + timedelta(days=10)
+    a = plan_subject([(1, 60), (2, 60)], TODAY, exam_a, CAP)
+    assert not a.missed
+    booked = _daily_totals(a.blocks)
+    # Planned alone around A's 2 hours a day, B's 30 hours do not fit.
+    assert plan_subject([(10, 30)], TODAY, exam_b, CAP, booked).missed
+
+    both = plan_subjects(
+        [
+            SubjectTasks(2, exam_b, [(10, 30)]),
+            SubjectTasks(1, exam_a, [(1, 60), (2, 60)]),
+        ],
+        TODAY,
+        CAP,
+    )
+    assert not both.missed
+    assert sum(b.hours for b in both.blocks[2]) == 30
+    assert all(b.day < exam_b for b in both.blocks[2])
+    assert sum(b.hours for b in both.blocks[1]) == 120
+    assert all(b.day < exam_a for b in both.blocks[1])
+    totals = _daily_totals(both.blocks[1] + both.blocks[2])
+    assert max(totals.values()) <= CAP
+
+
+def test_fixed_bookings_are_respected():
+    exam = TODAY + timedelta(days=3)
+    booked = {TODAY: CAP}
+    result = plan_subjects([SubjectTasks(1, exam, [(1, 8)])], TODAY, CAP, booked)
+    assert not result.missed
+    assert TODAY not in _daily_totals(result.blocks[1])
+
+
+def test_replan_moves_only_movable_rows():
+    from app.pages.plan.plan_backend import _replan_later_subjects
+
+    exam_a, exam_b = TODAY + timedelta(days=60), TODAY + timedelta(days=10)
+    rows = [
+        Row(100 + d, 1, 1 + d % 2, TODAY + timedelta(days=d), 2, exam_a.isoformat())
+        for d in range(60)
+    ]
+    booked = {r.study_date: r.hours for r in rows}
+    schedule, moved = _replan_later_subjects(
+        2, exam_b, [(10, 30)], rows, booked, TODAY
+    )
+    assert not schedule.missed
+    assert sum(b.hours for b in schedule.blocks) == 30
+    assert sum(b.hours for b in moved[1]) == 120
+
+
+@pytest.mark.parametrize("value", [None, "", "  ", "June"])
+def test_missing_or_bad_exam_date_is_a_schedule_error(value):
+    with pytest.raises(ScheduleError):
+        parse_exam_date(value)
@@ -0,0 +1,28 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.pages.auth import auth_backend
+from app.pages.auth.auth_backend import User, resolve_session
+from app.pages.auth.session_cache import session_cache
+from app.pages.auth.session_tokens import RevocationList
+
+
+def test_cached_session_revoked_on_another_worker(monkeypatch):
+    revocations = RevocationList()
+
+    async def refresh():
+        pass
+
+    monkeypatch.setattr(revocations, "refresh", refresh)
+    monkeypatch.setattr(auth_backend, "revocations", revocations)
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    resolved = (User(id=1, username="alice", email="a@example.com"), expires_at)
+    session_cache.put("sid", resolved)
+    try:
+        assert asyncio.run(resolve_session("sid")) == resolved
+        # What the sync picks up after a logout handled by another worker.
+        revocations.add("sid", expires_at)
+        assert asyncio.run(resolve_session("sid")) is None
+        assert session_cache.get("sid") is None
+    finally:
+        session_cache.invalidate("sid")
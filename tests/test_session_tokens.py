@@ -0,0 +1,105 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.pages.auth import auth_backend, session_tokens
+from app.pages.auth.session_tokens import (
+    SessionClaims,
+    check_token_config,
+    sign_session_token,
+    verify_session_token,
+)
+
+SECRET = b"s" * 32
+
+
+@pytest.fixture
+def hmac_mode(monkeypatch):
+    monkeypatch.setattr(session_tokens, "SESSION_TOKEN_MODE", "hmac")
+    monkeypatch.setattr(session_tokens, "SESSION_TOKEN_SECRET", SECRET)
+
+
+def _claims(expires_in: timedelta = timedelta(hours=1)) -> SessionClaims:
+    return SessionClaims(
+        user_id=1,
+        username="alice",
+        email="alice@example.com",
+        session_id="sid",
+        expires_at=datetime.utcnow().replace(microsecond=0) + expires_in,
+    )
+
+
+def _forge(key: bytes) -> str:
+    """A token for user 1 signed with key, built without the app's helpers."""
+
+    def b64(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+    exp = int((datetime.utcnow() + timedelta(hours=1)).timestamp())
+    body = b64(
+        json.dumps(
+            {"uid": 1, "usr": "admin", "eml": "a@b", "sid": "x", "exp": exp}
+        ).encode()
+    )
+    return f"{body}.{b64(hmac.new(key, body.encode(), hashlib.sha256).digest())}"
+
+
+def test_round_trip(hmac_mode):
+    claims = _claims()
+    assert verify_session_token(sign_session_token(claims)) == claims
+
+
+def test_tampered_body_is_rejected(hmac_mode):
+    body, _, signature = sign_session_token(_claims()).partition(".")
+    payload = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+    payload["uid"] = 2
+    forged_body = base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=")
+    assert verify_session_token(f"{forged_body.decode()}.{signature}") is None
+
+
+def test_tampered_signature_is_rejected(hmac_mode):
+    token = sign_session_token(_claims())
+    other = "AA" if token[-2:] != "AA" else "BB"
+    assert verify_session_token(token[:-2] + other) is None
+    assert verify_session_token(_forge(b"another secret" * 3)) is None
+
+
+def test_unsigned_token_is_rejected(hmac_mode):
+    body, _, _ = sign_session_token(_claims()).partition(".")
+    assert verify_session_token(body) is None
+    assert verify_session_token(body + ".") is None
+
+
+@pytest.mark.parametrize("token", ["é.abc", "abc.é", "\udcff.abc"])
+def test_non_ascii_token_is_rejected(hmac_mode, token):
+    assert verify_session_token(token) is None
+
+
+def test_expired_token_is_rejected(hmac_mode):
+    token = sign_session_token(_claims(-timedelta(seconds=1)))
+    assert verify_session_token(token) is None
+
+
+def test_signed_token_is_rejected_in_opaque_mode(monkeypatch):
+    monkeypatch.setattr(session_tokens, "SESSION_TOKEN_MODE", "opaque")
+    monkeypatch.setattr(session_tokens, "SESSION_TOKEN_SECRET", b"")
+    token = _forge(b"")
+    assert verify_session_token(token) is None
+    assert asyncio.run(auth_backend.resolve_session(token)) is None
+
+
+@pytest.mark.parametrize("secret", [b"", b"short"])
+def test_hmac_mode_needs_a_long_secret(secret):
+    with pytest.raises(RuntimeError):
+        check_token_config("hmac", secret)
+
+
+def test_unknown_mode_is_refused():
+    with pytest.raises(RuntimeError):
+        check_token_config("hamc", SECRET)
+    check_token_config("opaque", b"")
@@ -0,0 +1,100 @@
+import pickle
+
+import pytest
+
+from app.pages.plan.state_codec import (
+    CODEC_VERSION,
+    CodecVersionError,
+    Packed,
+    decode_id_set,
+    decode_plan_items,
+    decode_topics,
+    encode_id_set,
+    encode_plan_items,
+    encode_topics,
+    pack_fields,
+    unpack_fields,
+)
+
+PLAN_ITEMS = [
+    {
+        "id": 7,
+        "date": "2027-01-04",
+        "subject": "Biology",
+        "hours": 2,
+        "status": "Not Started",
+        "student_topic_id": 7,
+    },
+    {
+        "id": 70_000,
+        "date": "2027-01-04",
+        "subject": "Chemistry",
+        "hours": 3,
+        "status": "Completed",
+        "student_topic_id": 70_000,
+    },
+]
+
+
+def _round_trip(encode, decode, rows):
+    return decode(pickle.loads(pickle.dumps(encode(rows))))
+
+
+@pytest.mark.parametrize("rows", [[], PLAN_ITEMS])
+def test_plan_items_round_trip(rows):
+    assert _round_trip(encode_plan_items, decode_plan_items, rows) == rows
+
+
+def test_plan_items_with_none_and_wide_values():
+    rows = [
+        dict(PLAN_ITEMS[0], hours=None, date=None, status=None),
+        dict(PLAN_ITEMS[1], id=-1, student_topic_id=2**40, hours=2**70),
+    ]
+    assert _round_trip(encode_plan_items, decode_plan_items, rows) == rows
+
+
+def test_topics_with_none_hours_and_size():
+    topics = [
+        {"id": 1, "topic": "Cells", "size": "Small", "hours": None},
+        {"id": 2, "topic": "Enzymes", "size": None, "hours": 4},
+        {"id": 3, "topic": "Osmosis", "size": "Small", "hours": 300},
+    ]
+    assert _round_trip(encode_topics, decode_topics, topics) == topics
+
+
+def test_id_set_round_trip():
+    ids = {3: True, 1: True, 100_000: True}
+    assert _round_trip(encode_id_set, decode_id_set, ids) == ids
+
+
+def test_pack_fields_drops_computed_var_caches():
+    state = {
+        "study_plan_items": PLAN_ITEMS,
+        "plan_page": 2,
+        "__cached_topic_count": 10,
+    }
+    packed = pack_fields(state, {"study_plan_items": encode_plan_items})
+    assert "__cached_topic_count" not in packed
+    assert isinstance(packed["study_plan_items"], Packed)
+    assert unpack_fields(packed) == {"study_plan_items": PLAN_ITEMS, "plan_page": 2}
+
+
+def test_foreign_codec_version_is_refused():
+    packed = encode_id_set({1: True})._replace(version=CODEC_VERSION + 1)
+    with pytest.raises(CodecVersionError):
+        unpack_fields({"selected_topic_ids": packed})
+
+
+def test_plan_state_serializes_null_topic_hours():
+    from reflex.state import BaseState
+
+    from app.pages.plan.plan_backend import PlanState
+
+    state = PlanState(_reflex_internal_init=True)
+    state.visible_topics = [{"id": 1, "topic": "Cells", "size": None, "hours": None}]
+    state.study_plan_items = PLAN_ITEMS
+    state.selected_topic_ids = {1: True}
+    loaded = BaseState._deserialize(data=state._serialize())
+    assert loaded.visible_topics == state.visible_topics
+    assert loaded.study_plan_items == PLAN_ITEMS
+    assert loaded.selected_topic_ids == {1: True}
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from collections import namedtuple
+
+from app.pages.plan.catalog import CatalogIndex
+from app.pages.plan.topic_search import search_index
+
+SubjectRow = namedtuple("SubjectRow", "id level board subject examcode examdate")
+TopicRow = namedtuple("TopicRow", "id subjectid topic size hours")
+
+
+def _catalog(topics: int) -> CatalogIndex:
+    return CatalogIndex(
+        1,
+        [SubjectRow(1, "A Level", "AQA", "Biology", "7402", "2027-06-01")],
+        [
+            TopicRow(i, 1, f"photosynthesis cell {i} division", "Small", 1)
+            for i in range(topics)
+        ],
+    )
+
+
+def test_concurrent_first_searches_share_one_build():
+    catalog = _catalog(100)
+
+    async def main():
+        return await asyncio.gather(*(search_index(catalog, 1) for _ in range(5)))
+
+    indexes = asyncio.run(main())
+    assert all(index is indexes[0] for index in indexes)
+    assert len(indexes[0].search("photo cell", 10)) == 10
+
+
+def test_build_does_not_block_the_event_loop():
+    catalog = _catalog(50_000)
+    gaps = []
+
+    async def ticker(stop: asyncio.Event):
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def main():
+        stop = asyncio.Event()
+        tick = asyncio.create_task(ticker(stop))
+        await search_index(catalog, 1)
+        stop.set()
+        await tick
+
+    asyncio.run(main())
+    assert len(gaps) > 5
+    assert max(gaps) < 0.25